@@ -1,23 +1,58 @@
 """The Oocsi for HomeAssistant integration."""
 from __future__ import annotations
 
+import asyncio
+from functools import partial
 import logging
-from typing import ClassVar
-
-from oocsi import OOCSI as oocsiApi
-from voluptuous.validators import Number
-
+import math
+import time
 
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+from homeassistant.const import CONF_NAME
 from homeassistant.core import HomeAssistant, callback
 from homeassistant.helpers import entity_registry
 from homeassistant.helpers.dispatcher import async_dispatcher_send
 
 
-from .const import DATA_OOCSI, DOMAIN, OOCSI_ENTITY
-
-PLATFORMS = []
+from .bridge import oocsiStateExport
+from .cache import oocsiStateCache
+from .connection import async_acquire_connection, release_connection
+from .inbound import oocsiInboundQueue
+from .offload import oocsiPayloadOffload
+from .probe import oocsiLinkProbe
+from .const import (
+    CALL_TIMEOUT,
+    CHANNEL_POLICIES,
+    CONF_EXPORT,
+    CONF_EXPORT_CHANNEL,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PERSIST_STATE,
+    CONF_PROBE_INTERVAL,
+    DEFAULT_AGGREGATE_INTERVAL,
+    DEFAULT_EXPORT_CHANNEL,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_PROBE_INTERVAL,
+    DOMAIN,
+    FIRST_BURST_WINDOW,
+    INBOUND_CHANNEL_SIZE,
+    INBOUND_DRAIN_BATCH,
+    INBOUND_QUEUE_SIZE,
+    OFFLOAD_WORKERS,
+    OOCSI_ENTITY,
+    POLICY_KEEP_ALL,
+    SEQUENCE_KEY,
+    SEQUENCE_RESET_GAP,
+    SERVICE_CALL,
+    STATE_CACHE_SIZE,
+    STATE_CACHES,
+    STATE_CALL,
+    STATE_FETCH_CONCURRENCY,
+    STATE_FETCH_TIMEOUT,
+    STALE_RESET_COUNT,
+    TIMESTAMP_KEY,
+)
+
+PLATFORMS = ["number", "binary_sensor", "sensor", "switch", "light"]
 ACTIVATEDPLATFORMS = []
 _LOGGER = logging.getLogger(__name__)
 
@@ -26,45 +61,102 @@ _LOGGER = logging.getLogger(__name__)
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Oocsi for HomeAssistant from a config entry."""
 
-    # Import oocsi variables
-    name = entry.data[CONF_NAME]
-    host = entry.data[CONF_HOST]
-    port = entry.data[CONF_PORT]
+    timings = oocsiSetupTimings()
 
-    # Create and save oocsi
+    # Create or share the oocsi connection of this server and save it
     hass.data.setdefault(DOMAIN, {})
-    hass.data[DOMAIN][entry.entry_id] = oocsiApi(
-        name, host, port, None, _LOGGER.info, 1
-    )
+    connection = await async_acquire_connection(hass, entry)
+    hass.data[DOMAIN][entry.entry_id] = connection
+    timings.mark("connect")
     # Save oocsi connection to entity
     api = hass.data[DOMAIN][entry.entry_id]
 
     # Announce presence homeassistant, should be rententious soon
     api.send("heyOOCSI?", {"_RETAIN": 50000, "homeassistant": "on"})
+    timings.mark("announce")
     # Create interview storage
-    if OOCSI_ENTITY not in hass.data[DOMAIN]:
-        hass.data[DOMAIN][OOCSI_ENTITY] = {}
-        hass.data[DOMAIN][OOCSI_ENTITY][entry.entry_id] = {}
+    hass.data[DOMAIN].setdefault(OOCSI_ENTITY, {})
+    hass.data[DOMAIN][OOCSI_ENTITY][entry.entry_id] = {}
 
     # Start interviewing process
 
-    og = oocsiGateway(hass, entry, api)
+    og = oocsiGateway(hass, entry, connection, timings)
+    await og.state_cache.async_load()
     if "GATEWAY" not in hass.data[DOMAIN]:
         hass.data[DOMAIN]["GATEWAY"] = {}
+    timings.mark("gateway")
+
+    # Measure the link to the server when enabled
+    probe_interval = entry.options.get(CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL)
+    if probe_interval:
+        og.probe = oocsiLinkProbe(hass, og, probe_interval)
+        og.probe.async_start()
+        og.async_on_unload(og.probe.async_stop)
 
-    PLATFORMS = ["number", "binary_sensor", "sensor", "switch", "light"]
     hass.config_entries.async_setup_platforms(entry, PLATFORMS)
     hass.data[DOMAIN]["GATEWAY"][entry.entry_id] = og
+    timings.mark("platforms")
     await og.async_subscribe_heyOOCSI()
+    timings.mark("subscribe")
+    timings.log(entry.title)
+
+    # Republish allowed Home Assistant states on oocsi
+    export = oocsiStateExport(
+        hass,
+        api,
+        entry.options.get(CONF_EXPORT_CHANNEL, DEFAULT_EXPORT_CHANNEL),
+        entry.options.get(CONF_EXPORT, ""),
+    )
+    export.async_start()
+    og.async_on_unload(export.async_stop)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
+    if not hass.services.has_service(DOMAIN, SERVICE_CALL):
+        # Service schemas are only loaded once an entry is set up
+        from .services import async_register_services
+
+        async_register_services(hass)
 
     # Finish
     return True
 
 
+class oocsiSetupTimings:
+    """Phase durations of the integration startup, in milliseconds."""
+
+    def __init__(self) -> None:
+        self._start = time.monotonic()
+        self._last = self._start
+        self.phases = {}
+        self.milestones = {}
+
+    def mark(self, phase):
+        """Close a setup phase and start timing the next one."""
+        now = time.monotonic()
+        self.phases[phase] = round((now - self._last) * 1000, 2)
+        self._last = now
+
+    def milestone(self, name):
+        """Record the time since setup started."""
+        self.milestones[name] = round((time.monotonic() - self._start) * 1000, 2)
+
+    def log(self, title):
+        _LOGGER.debug("Setup of %s took %s (ms)", title, self.phases)
+
+    def as_dict(self):
+        return {"phases": dict(self.phases), "milestones": dict(self.milestones)}
+
+
 class oocsiGateway:
     # Creates entities out of interviews
-    def __init__(self, hass, entry, api) -> None:
-        self._api = api
+    def __init__(self, hass, entry, connection, timings=None) -> None:
+        self._connection = connection
+        # Sends go through the connection so they follow a server failover
+        self._api = connection
+        self._timings = timings or oocsiSetupTimings()
+        # Entity channels of the first interview burst not added yet
+        self._burst_deadline = time.monotonic() + FIRST_BURST_WINDOW
+        self._burst_channels = set()
         self._hass = hass
         self._entry = entry
         self._ent_reg = entity_registry.async_get(hass)
@@ -85,10 +177,258 @@ class oocsiGateway:
         }
 
         self._devices = oocsiDeviceStorage(self._hass, self._entry)
+        # Interview schemas are loaded with the first interview
+        self._validator = None
+        # Device id to interview key, one presence subscription per device
+        self._presence = {}
+        self.probe = None
+        self.recorder = None
+        self.profiler = None
+        self._fetched_channels = set()
+        # Channels with a state call in flight, True once a message overtook it
+        self._fetching = {}
+        self._fetch_semaphore = asyncio.Semaphore(STATE_FETCH_CONCURRENCY)
+        self._tasks = set()
+
+        # Every channel subscription and unload handle is owned by the gateway
+        self._subscriptions = {}
+        self._unsub_callbacks = []
+        self._inbound = oocsiInboundQueue(
+            hass.loop,
+            self._dispatch,
+            INBOUND_CHANNEL_SIZE,
+            INBOUND_QUEUE_SIZE,
+            INBOUND_DRAIN_BATCH,
+        )
+
+        # Newest sequence number or timestamp seen and stale drops per channel
+        self._last_order = {}
+        self._stale_run = {}
+        self.stale_dropped = {}
+
+        # Last known state of entity channels, kept across reloads and
+        # optionally across restarts
+        caches = hass.data.setdefault(DOMAIN, {}).setdefault(STATE_CACHES, {})
+        if entry.entry_id not in caches:
+            caches[entry.entry_id] = oocsiStateCache(
+                hass, entry.entry_id, STATE_CACHE_SIZE
+            )
+        self.state_cache = caches[entry.entry_id]
+        self.state_cache.persist = entry.options.get(CONF_PERSIST_STATE, False)
+        self._retained = set()
+
+        # Converters of channels with large payloads, run in a worker pool
+        self._converters = {}
+        self._offload = oocsiPayloadOffload(
+            hass.loop,
+            entry.options.get(CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD),
+            OFFLOAD_WORKERS,
+        )
 
     @callback
     async def async_subscribe_heyOOCSI(self):
-        self._api.subscribe("heyOOCSI!", self._handle_interview_event)
+        self.subscribe("heyOOCSI!", self._handle_interview_event)
+
+    def subscribe(self, channel, handler, policy=None, retain=False, convert=None):
+        """Subscribe a handler to a channel, return a function to remove it.
+
+        The optional policy decides which messages are dropped when the
+        channel floods the inbound queue. Retained channels keep their last
+        state, which is handed to the handler right away when known. With
+        convert, handlers of the channel get convert(payload) instead of the
+        payload, computed in a worker for large payloads.
+        """
+        if policy is not None:
+            self._inbound.set_policy(channel, policy)
+        if convert is not None:
+            self._converters[channel] = convert
+        if channel not in self._subscriptions:
+            self._subscriptions[channel] = []
+            self._connection.subscribe(channel, self._route_event)
+        self._subscriptions[channel].append(handler)
+        if retain:
+            self._retained.add(channel)
+            state = self.state_cache.get(channel)
+            if state is not None:
+                handler(channel, channel, convert(state) if convert else state)
+
+        @callback
+        def remove_handler():
+            handlers = self._subscriptions.get(channel)
+            if handlers is None or handler not in handlers:
+                return
+            handlers.remove(handler)
+            if not handlers:
+                self.unsubscribe(channel)
+
+        return remove_handler
+
+    def send(self, channel, payload):
+        """Send a message on a channel."""
+        self._api.send(channel, payload)
+
+    def unsubscribe(self, channel):
+        """Drop every handler of a channel and leave it on the server."""
+        self._last_order.pop(channel, None)
+        self._stale_run.pop(channel, None)
+        self._retained.discard(channel)
+        self._inbound.remove(channel)
+        if self._converters.pop(channel, None) is not None:
+            self._offload.remove(channel)
+        if self._subscriptions.pop(channel, None) is not None:
+            self._connection.unsubscribe(channel, self._route_event)
+
+    def _route_event(self, sender, recipient, event):
+        """Hand a message from the oocsi thread over to the event loop."""
+        self._inbound.put(sender, recipient, event)
+
+    @callback
+    def _dispatch(self, sender, recipient, event):
+        if self._accept(sender, recipient, event):
+            if recipient in self._fetching:
+                self._fetching[recipient] = True
+            self._deliver(sender, recipient, event)
+
+    @callback
+    def _deliver(self, sender, recipient, event):
+        """Cache and convert a message, then pass it to the channel handlers."""
+        if recipient in self._retained:
+            self.state_cache.put(recipient, event)
+        convert = self._converters.get(recipient)
+        if convert is None:
+            self._handle(sender, recipient, event)
+        else:
+            self._offload.run(
+                recipient, convert, event, partial(self._handle, sender, recipient)
+            )
+
+    @callback
+    def _handle(self, sender, recipient, event):
+        for handler in list(self._subscriptions.get(recipient, ())):
+            handler(sender, recipient, event)
+
+    @callback
+    def _profiled_handle(self, sender, recipient, event):
+        """Handle like _handle, running every handler under the profiler."""
+        for handler in list(self._subscriptions.get(recipient, ())):
+            self.profiler.run(handler, sender, recipient, event)
+
+    @callback
+    def async_start_profile(self):
+        """Profile message dispatch until async_stop_profile is called."""
+        # cProfile and pstats are only loaded when profiling is used
+        from .profiler import oocsiDispatchProfiler
+
+        self.profiler = oocsiDispatchProfiler()
+        # Swap the handler loop so nothing is checked while profiling is off
+        self._handle = self._profiled_handle
+
+    async def async_stop_profile(self, path, top):
+        """Stop profiling, write the profile to path and log a summary."""
+        profiler, self.profiler = self.profiler, None
+        self.__dict__.pop("_handle", None)
+        if profiler is None:
+            return
+        await self._hass.async_add_executor_job(profiler.dump, path)
+        _LOGGER.info("Wrote oocsi profile to %s\n%s", path, profiler.summary(top))
+
+    @callback
+    def async_inject(self, sender, channel, event):
+        """Handle a message as if it was received from the server.
+
+        Injected messages are neither recorded nor checked for order, so a
+        replay is not dropped as stale or recorded again.
+        """
+        self._deliver(sender, channel, event)
+
+    @callback
+    def _accept(self, sender, recipient, event):
+        """Record and order check a received message."""
+        if self.recorder is not None:
+            self.recorder.record(recipient, sender, event)
+        return not self._is_stale(recipient, event)
+
+    def _is_stale(self, channel, event):
+        """Return True for updates older than the last one applied.
+
+        Values that are not numbers are not ordered. A wrapped or reset
+        counter, or a clock stepping back, starts the order afresh.
+        """
+        key = SEQUENCE_KEY if SEQUENCE_KEY in event else TIMESTAMP_KEY
+        value = event.get(key)
+        if (
+            isinstance(value, bool)
+            or not isinstance(value, (int, float))
+            or not math.isfinite(value)
+        ):
+            return False
+
+        last = self._last_order.get(channel)
+        if last is not None and last[0] == key:
+            behind = last[1] - value
+            if key == SEQUENCE_KEY and behind == 0:
+                # Repeated sequence numbers are duplicates, equal timestamps are not
+                return self._drop_stale(channel)
+            if behind > 0 and not (key == SEQUENCE_KEY and behind > SEQUENCE_RESET_GAP):
+                run = self._stale_run.get(channel, 0) + 1
+                if run < STALE_RESET_COUNT:
+                    self._stale_run[channel] = run
+                    return self._drop_stale(channel)
+        self._stale_run.pop(channel, None)
+        self._last_order[channel] = (key, value)
+        return False
+
+    def _drop_stale(self, channel):
+        self.stale_dropped[channel] = self.stale_dropped.get(channel, 0) + 1
+        return True
+
+    @callback
+    def async_on_unload(self, func):
+        """Release func when the gateway shuts down."""
+        self._unsub_callbacks.append(func)
+
+    async def async_start_recording(self, path, max_bytes, backup_count):
+        """Record received traffic to path, restarting a running recording."""
+        from .traffic import oocsiTrafficRecorder
+
+        await self.async_stop_recording()
+        self.recorder = oocsiTrafficRecorder(self._hass, path, max_bytes, backup_count)
+        self.recorder.async_start()
+
+    async def async_stop_recording(self):
+        """Stop recording received traffic."""
+        recorder, self.recorder = self.recorder, None
+        if recorder is not None:
+            await recorder.async_stop()
+            _LOGGER.info("Recorded %s messages to %s", recorder.recorded, recorder.path)
+
+    @callback
+    def async_shutdown(self):
+        """Release every subscription, listener and task in one go."""
+        for task in self._tasks:
+            task.cancel()
+        self._tasks.clear()
+
+        if self.recorder is not None:
+            self._hass.async_create_task(self.async_stop_recording())
+
+        while self._unsub_callbacks:
+            self._unsub_callbacks.pop()()
+
+        for channel in self._subscriptions:
+            self._connection.unsubscribe(channel, self._route_event)
+        self._subscriptions.clear()
+        self._converters.clear()
+        self._offload.shutdown()
+        self._retained.clear()
+        self._presence.clear()
+        self._burst_channels.clear()
+        self._inbound.clear()
+        self._last_order.clear()
+        self._stale_run.clear()
+        self._fetched_channels.clear()
+        self._fetching.clear()
+        self._devices.clear()
 
     @callback
     def _async_add_device_callback(
@@ -105,9 +445,28 @@ class oocsiGateway:
         # Handle interview by comparing interview entries to previous registrations
         interviews = self._devices.return_entries()
         _LOGGER.info(f"heyOOCSI! Interview received from {sender} from oocsi")
+        if "first_interview" not in self._timings.milestones:
+            self._timings.milestone("first_interview")
         if event.items() not in interviews.items():
 
-            self._devices.add_interview(event)
+            if self._validator is None:
+                from .schema import oocsiInterviewValidator
+
+                self._validator = oocsiInterviewValidator()
+
+            # Keep only valid components, malformed ones are skipped one by one
+            interview = {}
+            for device, device_interview in event.items():
+                valid = self._validator.validate_device(device, device_interview)
+                if valid is not None:
+                    interview[device] = valid
+            self._devices.add_interview(interview)
+            if time.monotonic() < self._burst_deadline:
+                self._burst_channels.update(
+                    component["channel_name"]
+                    for device_interview in interview.values()
+                    for component in device_interview["components"].values()
+                )
 
             # add new entries
             # Check which platforms must be started for the interviewed entities
@@ -115,7 +474,9 @@ class oocsiGateway:
             for device in devices:
 
                 device_id = self._devices.get_device_id(device)
-                self._api.subscribe(f"presence({device_id})", self.handle_disconnection)
+                if device_id not in self._presence:
+                    self.subscribe(f"presence({device_id})", self.handle_disconnection)
+                self._presence[device_id] = device
                 entities = self._devices.getOocsiDeviceEntities(device)
 
                 for entity in entities:
@@ -128,33 +489,38 @@ class oocsiGateway:
 
     @callback
     def handle_disconnection(self, sender, recipient, event):
-        # Retrieve device
-        leaving_device = event["leave"]
-        # Check devices with the ID
-        devices = self._devices.getOocsiDevice()
-        for device in devices:
-
-            if self._devices.get_device_id(device) == leaving_device:
-
-                # Check if they are registered
-                entities = self._devices.getOocsiDeviceEntities(device)
-                for entity in entities:
-
-                    entity_type = self._devices.getOocsiEntityType(device, entity)
-                    channelname = self._devices.getOocsiEntityChannel(device, entity)
-                    leaving_entity = self._ent_reg.async_get_entity_id(
-                        entity_type,
-                        DOMAIN,
-                        channelname,
-                    )
-                    self._api.unsubscribe(channelname)
-                    self._ent_reg.async_remove(leaving_entity)
-
-                    self._ent_reg = entity_registry.async_get(self._hass)
-
-                    _LOGGER.info(f"Removed {entity} from oocsi {entity_type}")
-
-                self._devices.remove_interview(device)
+        if "join" in event:
+            _LOGGER.debug(f"{event['join']} joined {recipient}")
+            return
+        # Retrieve device through the id index
+        leaving_device = event.get("leave")
+        device = self._presence.pop(leaving_device, None)
+        if device is None or device not in self._devices.return_entries():
+            return
+        self.unsubscribe(recipient)
+
+        # Check if they are registered
+        entities = self._devices.getOocsiDeviceEntities(device)
+        for entity in entities:
+
+            entity_type = self._devices.getOocsiEntityType(device, entity)
+            channelname = self._devices.getOocsiEntityChannel(device, entity)
+            leaving_entity = self._ent_reg.async_get_entity_id(
+                entity_type,
+                DOMAIN,
+                channelname,
+            )
+            self.unsubscribe(channelname)
+            # Fetch the state again when the device rejoins
+            self._fetched_channels.discard(channelname)
+            if leaving_entity is not None:
+                self._ent_reg.async_remove(leaving_entity)
+
+            self._ent_reg = entity_registry.async_get(self._hass)
+
+            _LOGGER.info(f"Removed {entity} from oocsi {entity_type}")
+
+        self._devices.remove_interview(device)
 
     @callback
     async def async_create_new_platform_entity(
@@ -184,23 +550,142 @@ class oocsiGateway:
                     entity_info = self._devices.return_entity_info(device, entity)
                     creator = self._devices.return_creator(device)
                     oocsi_entity = oocsiEntity(
-                        entity, creator, entity_info, self._api, device_id
+                        entity, creator, entity_info, self._api, device_id, self
                     )
                     entities_to_add.append(entity_type_platform(hass, oocsi_entity))
                 _LOGGER.info("Added %s from %s as entity", entity, device)
             # Add entities
         async_add_entities(entities_to_add)
+        if self._burst_channels:
+            self._burst_channels.difference_update(
+                entity.unique_id for entity in entities_to_add
+            )
+            if not self._burst_channels:
+                self._timings.milestone("first_burst_entities_added")
+                _LOGGER.debug(
+                    "First interview burst entities added after %s ms",
+                    self._timings.milestones["first_burst_entities_added"],
+                )
+        task = self._hass.async_create_task(
+            self.async_fetch_initial_states(entities_to_add)
+        )
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    @property
+    def entry(self) -> ConfigEntry:
+        """Return the config entry of the gateway."""
+        return self._entry
+
+    @property
+    def handle(self) -> str:
+        """Return the name of the oocsi client."""
+        return self._connection.handle
+
+    @property
+    def inbound_dropped(self):
+        """Return the messages dropped by the inbound queue per channel."""
+        return dict(self._inbound.dropped)
+
+    @property
+    def failovers(self):
+        """Return the current server and the last server switches."""
+        return {
+            "endpoint": self._connection.endpoint,
+            "switches": list(self._connection.failovers),
+        }
+
+    @property
+    def offloaded(self) -> int:
+        """Return the number of payloads converted in a worker."""
+        return self._offload.offloaded
+
+    @property
+    def interview_rejected(self) -> int:
+        """Return the number of rejected interviews and components."""
+        if self._validator is None:
+            return 0
+        return self._validator.rejected
+
+    @property
+    def timings(self):
+        """Return the startup timing profile."""
+        return self._timings.as_dict()
+
+    async def async_fetch_initial_states(self, entities):
+        """Ask newly discovered entities for their current state.
+
+        Replies are applied as they arrive, unless the channel received a
+        message after the call was sent, which is newer than the reply.
+        """
+        channels = [
+            entity.unique_id
+            for entity in entities
+            if entity.unique_id not in self._fetched_channels
+        ]
+        if not channels:
+            return
+        self._fetched_channels.update(channels)
+
+        applied = await asyncio.gather(
+            *(self._async_fetch_state(channel) for channel in channels)
+        )
+        _LOGGER.debug(
+            "Fetched state for %s of %s entities", sum(applied), len(channels)
+        )
+
+    async def _async_fetch_state(self, channel):
+        """Request and apply the state of a channel, bounded by the semaphore."""
+        async with self._fetch_semaphore:
+            self._fetching[channel] = False
+            try:
+                response = await self.async_call(
+                    channel, {}, STATE_FETCH_TIMEOUT, call_name=STATE_CALL
+                )
+            finally:
+                overtaken = self._fetching.pop(channel, True)
+        if response is None or overtaken:
+            return False
+        self._dispatch(channel, channel, response)
+        return True
+
+    async def async_call(self, channel, payload, timeout=CALL_TIMEOUT, call_name=None):
+        """Call a responder on a channel and return its response.
+
+        The call name defaults to the channel name, None is returned when no
+        response arrives within the timeout.
+        """
+        return await self._connection.async_call(
+            self._hass, channel, call_name or channel, payload, timeout
+        )
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry when its options change."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the cached and persisted state of a removed entry."""
+    cache = hass.data.get(DOMAIN, {}).get(STATE_CACHES, {}).pop(entry.entry_id, None)
+    if cache is None:
+        cache = oocsiStateCache(hass, entry.entry_id, 0)
+    await cache.async_remove()
 
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
 
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
-    hass.data[DOMAIN][OOCSI_ENTITY][entry.entry_id].clear()
     if unload_ok:
-        api = hass.data[DOMAIN][entry.entry_id]
-        api.send("heyOOCSI?", {"_RETAIN": 50000, "homeassistant": "off"})
-        api.stop()
+        hass.data[DOMAIN]["GATEWAY"].pop(entry.entry_id).async_shutdown()
+        hass.data[DOMAIN][OOCSI_ENTITY].pop(entry.entry_id, None)
+        hass.data[DOMAIN].pop(entry.entry_id)
+        release_connection(hass, entry)
+        if not hass.data[DOMAIN]["GATEWAY"]:
+            from .services import async_remove_services
+
+            async_remove_services(hass)
 
     return unload_ok
 
@@ -222,6 +707,9 @@ class oocsiDeviceStorage:
         del self._storage[device]
         return
 
+    def clear(self):
+        self._storage.clear()
+
     def return_creator(self, deviceKey):
         if "creator" in self._storage[deviceKey]["properties"]:
             return self._storage[deviceKey]["properties"]["creator"]
@@ -248,10 +736,11 @@ class oocsiDeviceStorage:
 class oocsiEntity:
     """Simple oocsi interview unwrapper."""
 
-    def __init__(self, entity, creator, entity_interview, api, device_id):
+    def __init__(self, entity, creator, entity_interview, api, device_id, gateway):
         self._entity_interview = entity_interview
         self._entity_name = entity
         self._api = api
+        self._gateway = gateway
         self._channel = self._entity_interview["channel_name"]
         self._creator = creator
         self._device_id = device_id[0]
@@ -264,6 +753,23 @@ class oocsiEntity:
     def oocsi_api(self) -> classmethod:
         return self._api
 
+    def subscribe(self, channel_update_event, convert=None):
+        """Listen to the entity channel, return a function to stop listening."""
+        # Aggregating sensors need every sample, not only the latest, and
+        # their sample payloads are not worth keeping as last state
+        aggregating = self.aggregate is not None
+        if aggregating:
+            policy = POLICY_KEEP_ALL
+        else:
+            policy = CHANNEL_POLICIES.get(self.entity_type)
+        return self._gateway.subscribe(
+            self._channel,
+            channel_update_event,
+            policy,
+            retain=not aggregating,
+            convert=convert,
+        )
+
     @property
     def manufacturer(self) -> str:
         """Return Creator"""
@@ -327,6 +833,26 @@ class oocsiEntity:
         """Return the default state."""
         return self._current_state
 
+    @property
+    def aggregate(self) -> tuple[int, float] | None:
+        """Return the aggregation window in samples and publish interval."""
+        if "aggregate_window" in self._entity_interview:
+            return (
+                self._entity_interview["aggregate_window"],
+                self._entity_interview.get(
+                    "aggregate_interval", DEFAULT_AGGREGATE_INTERVAL
+                ),
+            )
+
+    @property
+    def debounce(self) -> tuple[float, float] | None:
+        """Return the rising and falling settle times in seconds."""
+        settle = self._entity_interview.get("debounce", 0)
+        rising = self._entity_interview.get("debounce_rising", settle)
+        falling = self._entity_interview.get("debounce_falling", settle)
+        if rising or falling:
+            return rising, falling
+
     @property
     def icon(self) -> str:
         """Return the icon."""
@@ -351,6 +877,11 @@ class oocsiEntity:
         if "led_type" in self._entity_interview:
             return self._entity_interview["led_type"]
 
+    @property
+    def transition(self) -> bool:
+        """Return whether the lamp fades between states itself."""
+        return bool(self._entity_interview.get("transition", False))
+
     @property
     def spectrum(self) -> list[str]:
         """ "Return the supported spectrum"""
@@ -0,0 +1,73 @@
+"""Acknowledgement tracking for optimistic state writes."""
+from __future__ import annotations
+
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+
+class oocsiAckTracker:
+    """Wait for a device to echo a sent state and time its round trip."""
+
+    def __init__(self, hass: HomeAssistant, timeout: float) -> None:
+        self._hass = hass
+        self._timeout = timeout
+        self._expected = None
+        self._sent = None
+        self._unsub_timeout: CALLBACK_TYPE | None = None
+        self.acknowledged = 0
+        self.timeouts = 0
+        self.last_latency = None
+        self._total_latency = 0.0
+
+    @callback
+    def start(self, expected, on_timeout) -> None:
+        """Expect state to be echoed, call on_timeout when it is not."""
+        self.cancel()
+        self._expected = expected
+        self._sent = time.monotonic()
+
+        @callback
+        def _async_timeout(_now):
+            self._unsub_timeout = None
+            self._expected = None
+            self.timeouts += 1
+            on_timeout()
+
+        self._unsub_timeout = async_call_later(
+            self._hass, self._timeout, _async_timeout
+        )
+
+    @callback
+    def acknowledge(self, state=None) -> bool:
+        """Resolve the pending echo if state matches, return True if it did.
+
+        Trackers started without an expected state resolve on any call.
+        """
+        if self._unsub_timeout is None or state != self._expected:
+            return False
+        self.last_latency = round((time.monotonic() - self._sent) * 1000, 2)
+        self._total_latency += self.last_latency
+        self.acknowledged += 1
+        self.cancel()
+        return True
+
+    @callback
+    def cancel(self) -> None:
+        """Stop waiting for the pending echo."""
+        if self._unsub_timeout is not None:
+            self._unsub_timeout()
+            self._unsub_timeout = None
+        self._expected = None
+
+    @property
+    def attributes(self) -> dict:
+        """Return the acknowledgement metrics."""
+        return {
+            "ack_latency": self.last_latency,
+            "ack_latency_mean": round(self._total_latency / self.acknowledged, 2)
+            if self.acknowledged
+            else None,
+            "ack_timeouts": self.timeouts,
+        }
@@ -0,0 +1,107 @@
+"""Fixed-size rolling aggregates for high-rate numeric channels."""
+from __future__ import annotations
+
+from array import array
+from functools import lru_cache
+import statistics
+
+from .const import SAMPLE_CHUNK
+from .offload import yield_worker
+
+
+@lru_cache(maxsize=None)
+def _numpy():
+    """Import NumPy on first use, None when it is not installed."""
+    try:
+        import numpy
+    except ImportError:  # pragma: no cover
+        return None
+    return numpy
+
+
+def samples_from_payload(event):
+    """Return the value of a payload as a sequence of float samples.
+
+    A value may be a single sample or a list of them. This is safe to run in
+    a worker thread, where NumPy converts in chunks: it holds the GIL while
+    converting, and the event loop gets its turn in between.
+    """
+    value = event.get("value")
+    if value is None:
+        return ()
+    if not isinstance(value, list):
+        value = [value]
+    np = _numpy()
+    try:
+        if np is None:
+            return [float(sample) for sample in value]
+        samples = np.empty(len(value), dtype=np.float64)
+        for start in range(0, len(value), SAMPLE_CHUNK):
+            yield_worker()
+            samples[start : start + SAMPLE_CHUNK] = value[start : start + SAMPLE_CHUNK]
+        return samples
+    except (TypeError, ValueError):
+        return ()
+
+
+class oocsiRingBuffer:
+    """Keep the last size samples in preallocated storage."""
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._index = 0
+        self._count = 0
+        self._np = np = _numpy()
+        if np is not None:
+            self._values = np.zeros(size, dtype=np.float64)
+        else:
+            self._values = array("d", bytes(8 * size))
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, value: float) -> None:
+        """Store a sample, overwriting the oldest once full."""
+        self._values[self._index] = value
+        self._index = (self._index + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    def extend(self, values) -> None:
+        """Store several samples, with a vectorised copy when possible."""
+        if self._np is None or len(values) < 2:
+            for value in values:
+                self.append(value)
+            return
+
+        values = values[-self._size :]
+        count = len(values)
+        end = self._index + count
+        if end <= self._size:
+            self._values[self._index : end] = values
+        else:
+            split = self._size - self._index
+            self._values[self._index :] = values[:split]
+            self._values[: count - split] = values[split:]
+        self._index = end % self._size
+        self._count = min(self._size, self._count + count)
+
+    def summary(self) -> dict | None:
+        """Return min, max, mean and population stddev of the window."""
+        if not self._count:
+            return None
+        # Slots fill from the start, so the first count slots are in use
+        values = self._values[: self._count]
+        if self._np is not None:
+            return {
+                "min": float(values.min()),
+                "max": float(values.max()),
+                "mean": float(values.mean()),
+                "stddev": float(values.std()),
+            }
+        return {
+            "min": min(values),
+            "max": max(values),
+            "mean": statistics.fmean(values),
+            "stddev": statistics.pstdev(values),
+        }
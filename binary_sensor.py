@@ -4,7 +4,7 @@ from __future__ import annotations
 from homeassistant.components.binary_sensor import BinarySensorEntity
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.event import async_call_later
 
 from .const import DOMAIN
 
@@ -24,7 +24,7 @@ async def async_setup_entry(
             hass, config_entry, api, BasicSensor, async_add_entities, platform
         )
 
-    config_entry.async_on_unload(
+    oocsiGateway.async_on_unload(
         async_dispatcher_connect(
             hass,
             oocsiGateway._signal_new_binary_sensor,
@@ -43,21 +43,63 @@ class BasicSensor(BinarySensorEntity):
         self._hass = hass
         self._name = self._property.name
         self._oocsi = self._property.oocsi_api()
-        self._device_class = self._property.type
         self._attr_unique_id = self._property.channel_name
         self._channel_state = self._property.state
 
+        # Edge debouncing, only states that settle are written
+        self._debounce = self._property.debounce
+        self._pending_state = None
+        self._unsub_settle = None
+        self._suppressed_edges = 0
+
     async def async_added_to_hass(self) -> None:
         """Add oocsi event listener."""
 
         @callback
         def channel_update_event(sender, recipient, event):
             """Execute oocsi state change."""
-            self._channel_state = event["state"]
-            self.async_write_ha_state()
+            if "state" not in event:
+                return
+            if self._debounce is None:
+                if event["state"] != self._channel_state:
+                    self._channel_state = event["state"]
+                    self.async_write_ha_state()
+            else:
+                self._debounce_state(event["state"])
+
+        self.async_on_remove(self._property.subscribe(channel_update_event))
+        self.async_on_remove(self._cancel_settle)
+
+    @callback
+    def _debounce_state(self, state) -> None:
+        """Hold a new state until it has been stable for the settle time."""
+        if self._unsub_settle is not None:
+            if state == self._pending_state:
+                # A repeat of the pending state, it keeps settling
+                return
+            # The previous edge did not settle
+            self._cancel_settle()
+            self._suppressed_edges += 1
+        if state == self._channel_state:
+            return
+
+        self._pending_state = state
+        rising, falling = self._debounce
+        self._unsub_settle = async_call_later(
+            self.hass, rising if state else falling, self._async_settled
+        )
+
+    @callback
+    def _async_settled(self, _now) -> None:
+        self._unsub_settle = None
+        self._channel_state = self._pending_state
+        self.async_write_ha_state()
 
-        # self._oocsi.subscribe(self._property.channel_name, channel_update_event)
-        self._property.subscribe(channel_update_event)
+    @callback
+    def _cancel_settle(self) -> None:
+        if self._unsub_settle is not None:
+            self._unsub_settle()
+            self._unsub_settle = None
 
     @property
     def name(self):
@@ -86,10 +128,16 @@ class BasicSensor(BinarySensorEntity):
     @property
     def icon(self) -> str:
         """Return the icon."""
-        if self._property.logo is not None:
-            return self._property.logo
-        else:
+        if self._property.icon is None:
             return "mdi:electric-switch"
+        else:
+            return f"mdi:{self._property.icon}"
+
+    @property
+    def extra_state_attributes(self):
+        """Return the number of suppressed edges of debounced sensors."""
+        if self._debounce is not None:
+            return {"suppressed_edges": self._suppressed_edges}
 
     @property
     def assumed_state(self) -> bool:
@@ -98,7 +146,7 @@ class BasicSensor(BinarySensorEntity):
     @property
     def is_on(self):
         """Return true if the switch is on."""
-        return self._property.state
+        return self._channel_state
 
     async def async_turn_on(self) -> None:
         """Turn the entity on."""
@@ -0,0 +1,85 @@
+"""Republish Home Assistant states on oocsi."""
+from __future__ import annotations
+
+import logging
+
+from homeassistant.const import EVENT_STATE_CHANGED
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import EXPORT_FLUSH_INTERVAL
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def parse_export(export: str) -> tuple[frozenset[str], frozenset[str]]:
+    """Split a comma separated allowlist into entity ids and domains."""
+    entity_ids = set()
+    domains = set()
+    for item in export.split(","):
+        item = item.strip()
+        if not item:
+            continue
+        if "." in item:
+            entity_ids.add(item)
+        else:
+            domains.add(item)
+    return frozenset(entity_ids), frozenset(domains)
+
+
+class oocsiStateExport:
+    """Coalesce allowed state changes and send them as one message per tick."""
+
+    def __init__(self, hass: HomeAssistant, api, channel: str, export: str) -> None:
+        self._hass = hass
+        self._api = api
+        self._channel = channel
+        self._entity_ids, self._domains = parse_export(export)
+        self._pending = {}
+        self._unsub_listener: CALLBACK_TYPE | None = None
+        self._unsub_flush: CALLBACK_TYPE | None = None
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for state changes of the allowed entities."""
+        if not self._entity_ids and not self._domains:
+            return
+        self._unsub_listener = self._hass.bus.async_listen(
+            EVENT_STATE_CHANGED, self._async_state_changed
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop listening and drop unsent states."""
+        if self._unsub_listener is not None:
+            self._unsub_listener()
+            self._unsub_listener = None
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        self._pending.clear()
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        entity_id = event.data["entity_id"]
+        if (
+            entity_id not in self._entity_ids
+            and entity_id.partition(".")[0] not in self._domains
+        ):
+            return
+
+        new_state = event.data["new_state"]
+        # Later changes in the same tick overwrite earlier ones
+        self._pending[entity_id] = None if new_state is None else new_state.state
+        if self._unsub_flush is None:
+            self._unsub_flush = async_call_later(
+                self._hass, EXPORT_FLUSH_INTERVAL, self._async_flush
+            )
+
+    @callback
+    def _async_flush(self, _now) -> None:
+        self._unsub_flush = None
+        batch, self._pending = self._pending, {}
+        if batch:
+            self._api.send(self._channel, batch)
+            _LOGGER.debug("Exported %s states to %s", len(batch), self._channel)
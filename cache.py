@@ -0,0 +1,106 @@
+"""Last known state of subscribed channels."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import sys
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, STATE_CACHE_SAVE_DELAY, STATE_CACHE_VERSION
+
+
+def _sizeof(value) -> int:
+    """Estimate the memory used by a payload, including nested values."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_sizeof(key) + _sizeof(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_sizeof(item) for item in value)
+    return size
+
+
+class oocsiStateCache:
+    """LRU cache of the merged last message of each channel.
+
+    The cache outlives reloads of its entry. When persisted it is also saved
+    as a snapshot, so entities created after a restart start from the last
+    state their device published.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, entry_id: str, size: int, persist: bool = False
+    ):
+        self._size = size
+        self._states = OrderedDict()
+        self._store = Store(
+            hass, STATE_CACHE_VERSION, f"{DOMAIN}.state_cache.{entry_id}"
+        )
+        self._loaded = False
+        self.persist = persist
+        self.hits = 0
+        self.misses = 0
+
+    async def async_load(self) -> None:
+        """Load the persisted snapshot once, keeping newer cached states."""
+        if not self.persist or self._loaded:
+            return
+        self._loaded = True
+        data = await self._store.async_load()
+        # Snapshot states go behind the cached ones, newest first
+        for channel, state in reversed(list((data or {}).items())):
+            if len(self._states) >= self._size:
+                break
+            if channel not in self._states:
+                self._states[channel] = state
+                self._states.move_to_end(channel, last=False)
+
+    async def async_remove(self) -> None:
+        """Delete the persisted snapshot."""
+        await self._store.async_remove()
+
+    @callback
+    def put(self, channel, event) -> None:
+        """Merge a message into the cached state of its channel."""
+        state = self._states.get(channel)
+        if state is None:
+            self._states[channel] = dict(event)
+            if len(self._states) > self._size:
+                self._states.popitem(last=False)
+        else:
+            state.update(event)
+            self._states.move_to_end(channel)
+        if self.persist:
+            self._store.async_delay_save(self._snapshot, STATE_CACHE_SAVE_DELAY)
+
+    @callback
+    def get(self, channel):
+        """Return a copy of the cached state of a channel, or None."""
+        state = self._states.get(channel)
+        if state is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._states.move_to_end(channel)
+        return dict(state)
+
+    @callback
+    def _snapshot(self):
+        # Copies, the store serializes them while put keeps merging updates
+        return {channel: dict(state) for channel, state in self._states.items()}
+
+    @property
+    def stats(self) -> dict:
+        """Return the size, hit rate and estimated memory of the cache."""
+        lookups = self.hits + self.misses
+        return {
+            "channels": len(self._states),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else None,
+            "memory_bytes": sys.getsizeof(self._states)
+            + sum(
+                sys.getsizeof(channel) + _sizeof(state)
+                for channel, state in self._states.items()
+            ),
+        }
@@ -4,15 +4,28 @@ from __future__ import annotations
 import logging
 from typing import Any
 
-from oocsi import OOCSI, OOCSIDisconnect
 import voluptuous as vol
 
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.exceptions import HomeAssistantError
 
-from .const import DOMAIN
+from .connection import oocsi_client_class
+from .const import (
+    CONF_EXPORT,
+    CONF_EXPORT_CHANNEL,
+    CONF_FALLBACK_SERVERS,
+    CONF_OFFLOAD_THRESHOLD,
+    CONF_PERSIST_STATE,
+    CONF_PROBE_INTERVAL,
+    DEFAULT_EXPORT_CHANNEL,
+    DEFAULT_OFFLOAD_THRESHOLD,
+    DEFAULT_PROBE_INTERVAL,
+    DOMAIN,
+    MIN_PROBE_INTERVAL,
+)
 
 "Import everything that is necessary"
 
@@ -42,12 +55,20 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.port = CONF_PORT
         self.host = CONF_HOST
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(config_entry):
+        """Get the options flow for this handler."""
+        return OptionsFlowHandler(config_entry)
+
     async def async_step_user(
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
         errors = {}
         if user_input is not None:
+            from oocsi import OOCSIDisconnect
+
             try:
                 await self._connect_to_oocsi(user_input)
 
@@ -76,10 +97,66 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         self.name = user_input[CONF_NAME]
         self.host = user_input[CONF_HOST]
         self.port = user_input[CONF_PORT]
-        oocsiconnect = OOCSI(self.name, self.host, self.port, None, _LOGGER.info, 1)
+        client_class = await self.hass.async_add_executor_job(oocsi_client_class)
+        oocsiconnect = await self.hass.async_add_executor_job(
+            client_class, self.name, self.host, self.port, None, _LOGGER.info, 1
+        )
         oocsiconnect.stop()
 
 
+class OptionsFlowHandler(config_entries.OptionsFlow):
+    """Handle Oocsi for HomeAssistant options."""
+
+    def __init__(self, config_entry):
+        """Initialize options flow."""
+        self.config_entry = config_entry
+
+    async def async_step_init(
+        self, user_input: dict[str, Any] | None = None
+    ) -> FlowResult:
+        """Manage the options."""
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        return self.async_show_form(
+            step_id="init",
+            data_schema=vol.Schema(
+                {
+                    vol.Optional(
+                        CONF_EXPORT, default=options.get(CONF_EXPORT, "")
+                    ): str,
+                    vol.Optional(
+                        CONF_EXPORT_CHANNEL,
+                        default=options.get(
+                            CONF_EXPORT_CHANNEL, DEFAULT_EXPORT_CHANNEL
+                        ),
+                    ): str,
+                    vol.Optional(
+                        CONF_PROBE_INTERVAL,
+                        default=options.get(
+                            CONF_PROBE_INTERVAL, DEFAULT_PROBE_INTERVAL
+                        ),
+                    ): vol.Any(0, vol.All(int, vol.Range(min=MIN_PROBE_INTERVAL))),
+                    vol.Optional(
+                        CONF_FALLBACK_SERVERS,
+                        default=options.get(CONF_FALLBACK_SERVERS, ""),
+                    ): str,
+                    vol.Optional(
+                        CONF_OFFLOAD_THRESHOLD,
+                        default=options.get(
+                            CONF_OFFLOAD_THRESHOLD, DEFAULT_OFFLOAD_THRESHOLD
+                        ),
+                    ): vol.All(int, vol.Range(min=0)),
+                    vol.Optional(
+                        CONF_PERSIST_STATE,
+                        default=options.get(CONF_PERSIST_STATE, False),
+                    ): bool,
+                }
+            ),
+        )
+
+
 class CannotConnect(HomeAssistantError):
     """Error to indicate we cannot connect."""
 
@@ -0,0 +1,360 @@
+"""Shared oocsi connections for config entries on the same server."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+from functools import lru_cache
+import heapq
+import logging
+import time
+import uuid
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant
+from homeassistant.exceptions import ConfigEntryNotReady
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import (
+    CALL_SWEEP_GRACE,
+    CONF_FALLBACK_SERVERS,
+    CONNECT_TIMEOUT,
+    CONNECTIONS,
+    DOMAIN,
+    FAILOVER_CHECK_INTERVAL,
+    FAILOVER_PROBE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class oocsiPendingCall(dict):
+    """Call record filled in by the oocsi client, resolving a future on reply."""
+
+    def __init__(self, loop, future, **fields) -> None:
+        super().__init__(**fields)
+        self._loop = loop
+        self._future = future
+
+    def __setitem__(self, key, value):
+        super().__setitem__(key, value)
+        if key == "response":
+            # Copy on the oocsi thread, the client strips the id right after
+            response = {k: v for k, v in value.items() if k != "_MESSAGE_ID"}
+            self._loop.call_soon_threadsafe(self._resolve, response)
+
+    def _resolve(self, response):
+        if not self._future.done():
+            self._future.set_result(response)
+
+
+def parse_servers(servers: str) -> list[tuple[str, int]]:
+    """Parse a comma separated list of host:port endpoints."""
+    endpoints = []
+    for server in servers.split(","):
+        host, _, port = server.strip().rpartition(":")
+        if host and port.isdigit():
+            endpoints.append((host, int(port)))
+    return endpoints
+
+
+async def async_probe_endpoint(host: str, port: int) -> float | None:
+    """Return the TCP connect time to an endpoint in ms, None if it is down."""
+    start = time.monotonic()
+    try:
+        _, writer = await asyncio.wait_for(
+            asyncio.open_connection(host, port), FAILOVER_PROBE_TIMEOUT
+        )
+    except (OSError, asyncio.TimeoutError):
+        return None
+    latency = (time.monotonic() - start) * 1000
+    writer.close()
+    return latency
+
+
+@lru_cache(maxsize=None)
+def oocsi_client_class():
+    """Return an oocsi client class whose constructor gives up after a timeout.
+
+    The library's constructor busy-waits until it is connected, forever when
+    the server is down. The subclass sleeps while waiting and raises
+    OOCSIDisconnect once the timeout passes.
+    """
+    # The client library is only loaded once a connection is needed
+    from oocsi import OOCSI, OOCSIDisconnect
+
+    class oocsiClient(OOCSI):
+        _connected = False
+        _deadline = None
+
+        def __init__(self, *args, timeout: float = CONNECT_TIMEOUT) -> None:
+            self._deadline = time.monotonic() + timeout
+            try:
+                super().__init__(*args)
+            finally:
+                self._deadline = None
+
+        @property
+        def connected(self) -> bool:
+            if not self._connected and self._deadline is not None:
+                if time.monotonic() > self._deadline:
+                    self._deadline = None
+                    self._abandon()
+                    raise OOCSIDisconnect(f"No connection to {self.server_address}")
+                time.sleep(0.05)
+            return self._connected
+
+        @connected.setter
+        def connected(self, value: bool) -> None:
+            self._connected = value
+
+        def _abandon(self) -> None:
+            """Stop the connection thread of a client that never connected."""
+            self.reconnect = False
+            sock = getattr(self, "sock", None)
+            if sock is not None:
+                sock.close()
+
+    return oocsiClient
+
+
+async def async_connect(hass: HomeAssistant, client_factory, candidates):
+    """Connect to the fastest healthy candidate, return the client and endpoint.
+
+    Candidates are probed first, then tried in order of latency. None is
+    returned when none of them can be connected to.
+    """
+    latencies = await asyncio.gather(
+        *(async_probe_endpoint(*endpoint) for endpoint in candidates)
+    )
+    healthy = sorted(
+        (latency, index)
+        for index, latency in enumerate(latencies)
+        if latency is not None
+    )
+    for _, index in healthy:
+        endpoint = candidates[index]
+        try:
+            client = await hass.async_add_executor_job(client_factory, *endpoint)
+        except Exception as err:  # pylint: disable=broad-except
+            _LOGGER.warning("Connecting to %s:%s failed: %s", *endpoint, err)
+            continue
+        return client, endpoint
+    return None
+
+
+class oocsiConnection:
+    """Reference counted oocsi client multiplexed over several gateways.
+
+    With fallback endpoints the connection watches its client and moves to
+    the fastest healthy server when it drops, returning to the primary
+    server once that is reachable again.
+    """
+
+    def __init__(self, hass, client, client_factory, endpoints, endpoint=None) -> None:
+        self.client = client
+        self.entries = set()
+        self._routes = {}
+        self._call_expirations = []
+        self._attach(client)
+
+        self._hass = hass
+        self._client_factory = client_factory
+        self._endpoints = endpoints
+        self.endpoint = endpoint or endpoints[0]
+        self.failovers = []
+        self._switching = False
+        self._unsub_monitor: CALLBACK_TYPE | None = None
+        if len(endpoints) > 1:
+            self._unsub_monitor = async_track_time_interval(
+                hass, self._async_check, timedelta(seconds=FAILOVER_CHECK_INTERVAL)
+            )
+
+    def _attach(self, client):
+        """Route messages sent directly to the client's handle."""
+        client.receivers[client.handle] = [self._fan_out]
+
+    @property
+    def handle(self) -> str:
+        """Return the name of the client, which others can message directly."""
+        return self.client.handle
+
+    def send(self, channel, data):
+        """Send a message through the current client."""
+        self.client.send(channel, data)
+
+    def stop(self):
+        """Stop monitoring and close the client."""
+        if self._unsub_monitor is not None:
+            self._unsub_monitor()
+            self._unsub_monitor = None
+        self.client.stop()
+
+    def subscribe(self, channel, route):
+        """Route a channel to a gateway, subscribing on the server once."""
+        if channel not in self._routes:
+            self._routes[channel] = []
+            if channel != self.handle:
+                self.client.subscribe(channel, self._fan_out)
+        if route not in self._routes[channel]:
+            self._routes[channel].append(route)
+
+    def unsubscribe(self, channel, route):
+        """Stop routing a channel to a gateway, leave it when unused."""
+        routes = self._routes.get(channel)
+        if routes is None or route not in routes:
+            return
+        routes.remove(route)
+        if not routes:
+            del self._routes[channel]
+            if channel != self.handle:
+                self.client.unsubscribe(channel)
+
+    @property
+    def subscription_count(self) -> int:
+        """Return the number of channels subscribed on the server."""
+        return len(self._routes)
+
+    async def async_call(self, hass, channel, call_name, data, timeout):
+        """Send a call and wait for its response, None when it times out."""
+        self._sweep_calls()
+        message_id = str(uuid.uuid4())
+        future = hass.loop.create_future()
+
+        # The client's call map is the pending map, responses find it by id
+        self.client.calls[message_id] = oocsiPendingCall(
+            hass.loop,
+            future,
+            _MESSAGE_HANDLE=call_name,
+            _MESSAGE_ID=message_id,
+            expiration=time.time() + timeout,
+        )
+        heapq.heappush(
+            self._call_expirations,
+            (time.monotonic() + timeout + CALL_SWEEP_GRACE, message_id),
+        )
+        self.client.send(
+            channel, {**data, "_MESSAGE_HANDLE": call_name, "_MESSAGE_ID": message_id}
+        )
+
+        try:
+            response = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            # Leave the record for late replies, the sweep removes it
+            return None
+        self.client.calls.pop(message_id, None)
+        return response
+
+    def _sweep_calls(self):
+        """Forget expired calls whose grace period for late replies is over."""
+        now = time.monotonic()
+        while self._call_expirations and self._call_expirations[0][0] < now:
+            _, message_id = heapq.heappop(self._call_expirations)
+            self.client.calls.pop(message_id, None)
+
+    async def _async_check(self, _now) -> None:
+        """Fail over when the client dropped, or return to the primary."""
+        if self._switching:
+            return
+        primary = self._endpoints[0]
+        if self.client.connected:
+            if self.endpoint == primary or await async_probe_endpoint(*primary) is None:
+                return
+            candidates = [primary]
+        else:
+            candidates = self._endpoints
+
+        self._switching = True
+        try:
+            await self._async_switch(candidates)
+        finally:
+            self._switching = False
+
+    async def _async_switch(self, candidates) -> None:
+        """Connect to the fastest healthy candidate and resubscribe."""
+        start = time.monotonic()
+        connected = await async_connect(self._hass, self._client_factory, candidates)
+        if connected is None:
+            _LOGGER.warning("No oocsi server of %s is reachable", candidates)
+            return
+
+        client, endpoint = connected
+        self._attach(client)
+        for channel in self._routes:
+            if channel != client.handle:
+                client.subscribe(channel, self._fan_out)
+        client.send("heyOOCSI?", {"_RETAIN": 50000, "homeassistant": "on"})
+
+        old_client, self.client = self.client, client
+        old_endpoint, self.endpoint = self.endpoint, endpoint
+        await self._hass.async_add_executor_job(old_client.stop)
+
+        duration = round((time.monotonic() - start) * 1000, 2)
+        self.failovers.append(
+            {"from": old_endpoint, "to": endpoint, "duration_ms": duration}
+        )
+        del self.failovers[:-10]
+        _LOGGER.warning(
+            "Switched oocsi server from %s:%s to %s:%s in %s ms",
+            *old_endpoint,
+            *endpoint,
+            duration,
+        )
+
+    def _fan_out(self, sender, recipient, event):
+        for route in list(self._routes.get(recipient, ())):
+            route(sender, recipient, event)
+
+
+async def async_acquire_connection(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> oocsiConnection:
+    """Return the connection for the entry's server, connecting if needed."""
+    pool = hass.data[DOMAIN].setdefault(CONNECTIONS, {})
+    lock = hass.data[DOMAIN].setdefault(f"{CONNECTIONS}_lock", asyncio.Lock())
+    key = (entry.data[CONF_HOST], entry.data[CONF_PORT])
+
+    async with lock:
+        if key not in pool:
+            client_class = await hass.async_add_executor_job(oocsi_client_class)
+
+            def client_factory(host, port):
+                name = entry.data[CONF_NAME]
+                return client_class(name, host, port, None, _LOGGER.info, 1)
+
+            endpoints = [key] + parse_servers(
+                entry.options.get(CONF_FALLBACK_SERVERS, "")
+            )
+            connected = await async_connect(hass, client_factory, endpoints)
+            if connected is None:
+                raise ConfigEntryNotReady(
+                    f"No oocsi server of {endpoints} is reachable"
+                )
+            client, endpoint = connected
+            if endpoint != key:
+                _LOGGER.warning("Primary oocsi server is down, using %s:%s", *endpoint)
+            pool[key] = oocsiConnection(
+                hass, client, client_factory, endpoints, endpoint
+            )
+        else:
+            _LOGGER.debug("Sharing oocsi connection to %s:%s", *key)
+        pool[key].entries.add(entry.entry_id)
+        return pool[key]
+
+
+def release_connection(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Drop the entry's reference, return True when the client was stopped."""
+    pool = hass.data[DOMAIN].get(CONNECTIONS, {})
+    key = (entry.data[CONF_HOST], entry.data[CONF_PORT])
+    connection = pool.get(key)
+    if connection is None:
+        return False
+
+    connection.entries.discard(entry.entry_id)
+    if connection.entries:
+        return False
+
+    del pool[key]
+    connection.send("heyOOCSI?", {"_RETAIN": 50000, "homeassistant": "off"})
+    connection.stop()
+    return True
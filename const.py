@@ -5,4 +5,98 @@ DATA_OOCSI = "oocsi_api"
 DEVICES = None
 DATA_INTERVIEW = "weird"
 OOCSI_ENTITY = "OOCSI_ENTITY"
+CONNECTIONS = "CONNECTIONS"
+STATE_CACHES = "STATE_CACHES"
 # OOCSI_DEVICE_REG = [DOMAIN][OOCSI_ENTITY][entry.entry_id]
+
+# Initial state fetch over OOCSI call/response
+STATE_CALL = "state"
+STATE_FETCH_CONCURRENCY = 16
+STATE_FETCH_TIMEOUT = 2
+
+# Interviews answering the announce within this many seconds form the first burst
+FIRST_BURST_WINDOW = 5
+
+# Validated interview components kept for re-announcements
+INTERVIEW_CACHE_SIZE = 512
+
+# Optional payload fields used to discard out-of-order updates
+SEQUENCE_KEY = "seq"
+TIMESTAMP_KEY = "ts"
+# A sequence number this far below the last one means the counter wrapped or
+# the device restarted, as does this many stale updates in a row
+SEQUENCE_RESET_GAP = 128
+STALE_RESET_COUNT = 3
+
+# Request/response calls
+CALL_TIMEOUT = 5
+CALL_SWEEP_GRACE = 30
+EVENT_CALL_RESPONSE = "oocsi_call_response"
+SERVICE_CALL = "call"
+
+# Home Assistant to OOCSI state export
+CONF_EXPORT = "export"
+CONF_EXPORT_CHANNEL = "export_channel"
+DEFAULT_EXPORT_CHANNEL = "homeassistant_states"
+EXPORT_FLUSH_INTERVAL = 0.5
+
+# Round-trip latency probe
+CONF_PROBE_INTERVAL = "probe_interval"
+DEFAULT_PROBE_INTERVAL = 30
+MIN_PROBE_INTERVAL = 5
+PROBE_TIMEOUT = 10
+PROBE_WINDOW = 60
+
+# Traffic recording and replay
+EVENT_REPLAY_FINISHED = "oocsi_replay_finished"
+RECORD_BACKUP_COUNT = 3
+RECORD_FILE = "oocsi_traffic.jsonl"
+RECORD_FLUSH_INTERVAL = 1
+RECORD_MAX_BYTES = 10 * 1024 * 1024
+SERVICE_REPLAY = "replay"
+SERVICE_START_RECORDING = "start_recording"
+SERVICE_STOP_RECORDING = "stop_recording"
+
+# On-demand dispatch profiling
+PROFILE_TOP = 20
+SERVICE_START_PROFILE = "start_profile"
+SERVICE_STOP_PROFILE = "stop_profile"
+
+# Rolling aggregates of numeric sensors
+DEFAULT_AGGREGATE_INTERVAL = 10
+
+# Bounded inbound queue and per-channel overload policies
+INBOUND_CHANNEL_SIZE = 50
+INBOUND_DRAIN_BATCH = 100
+INBOUND_QUEUE_SIZE = 5000
+POLICY_DROP_NEW = "drop_new"
+POLICY_KEEP_ALL = "keep_all"
+POLICY_LATEST = "latest"
+CHANNEL_POLICIES = {
+    "binary_sensor": POLICY_KEEP_ALL,
+    "light": POLICY_KEEP_ALL,
+    "number": POLICY_LATEST,
+    "sensor": POLICY_LATEST,
+    "switch": POLICY_KEEP_ALL,
+}
+
+# Optimistic writes waiting for the device echo
+ACK_TIMEOUT = 3
+
+# Last known state per channel
+CONF_PERSIST_STATE = "persist_state"
+STATE_CACHE_SAVE_DELAY = 30
+STATE_CACHE_SIZE = 2000
+STATE_CACHE_VERSION = 1
+
+# Failover between several oocsi servers
+CONF_FALLBACK_SERVERS = "fallback_servers"
+FAILOVER_CHECK_INTERVAL = 10
+FAILOVER_PROBE_TIMEOUT = 2
+CONNECT_TIMEOUT = 10
+
+# Conversion of large payloads in a worker pool
+CONF_OFFLOAD_THRESHOLD = "offload_threshold"
+DEFAULT_OFFLOAD_THRESHOLD = 1000
+OFFLOAD_WORKERS = 1
+SAMPLE_CHUNK = 16384
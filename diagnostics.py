@@ -0,0 +1,26 @@
+"""Diagnostics support for Oocsi for HomeAssistant."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    gateway = hass.data[DOMAIN]["GATEWAY"][entry.entry_id]
+
+    return {
+        "setup_timings": gateway.timings,
+        "failover": gateway.failovers,
+        "stale_dropped": dict(gateway.stale_dropped),
+        "inbound_dropped": gateway.inbound_dropped,
+        "offloaded_payloads": gateway.offloaded,
+        "interview_rejected": gateway.interview_rejected,
+        "state_cache": gateway.state_cache.stats,
+    }
@@ -0,0 +1,110 @@
+"""Bounded queue between the oocsi receive thread and the event loop."""
+from __future__ import annotations
+
+from collections import Counter, deque
+import logging
+import threading
+
+from .const import POLICY_DROP_NEW, POLICY_KEEP_ALL, POLICY_LATEST
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class oocsiInboundQueue:
+    """Queue received messages per channel and hand them out round-robin.
+
+    Each channel has an overload policy: latest keeps only the newest pending
+    message, keep_all keeps up to channel_size and drops the oldest, drop_new
+    keeps up to channel_size and drops incoming messages.
+    """
+
+    def __init__(
+        self, loop, dispatch, channel_size: int, total_size: int, batch: int
+    ) -> None:
+        self._loop = loop
+        self.dispatch = dispatch
+        self._channel_size = channel_size
+        self._total_size = total_size
+        self._batch = batch
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._policies = {}
+        # Channels with pending messages, in round-robin order
+        self._ready = deque()
+        self._total = 0
+        self._scheduled = False
+        self.dropped = Counter()
+
+    def set_policy(self, channel, policy) -> None:
+        """Set the overload policy of a channel."""
+        self._policies[channel] = policy
+
+    def remove(self, channel) -> None:
+        """Forget the policy and pending messages of a channel."""
+        with self._lock:
+            self._policies.pop(channel, None)
+            queue = self._queues.pop(channel, None)
+            if queue:
+                self._total -= len(queue)
+
+    def clear(self) -> None:
+        """Drop every pending message."""
+        with self._lock:
+            self._queues.clear()
+            self._policies.clear()
+            self._ready.clear()
+            self._total = 0
+
+    def put(self, sender, channel, event) -> None:
+        """Queue a message, called from the oocsi thread."""
+        with self._lock:
+            queue = self._queues.get(channel)
+            if queue is None:
+                queue = self._queues[channel] = deque()
+            policy = self._policies.get(channel, POLICY_KEEP_ALL)
+
+            if policy == POLICY_LATEST and queue:
+                queue[-1] = (sender, event)
+                self.dropped[channel] += 1
+                return
+
+            if len(queue) >= self._channel_size or self._total >= self._total_size:
+                self.dropped[channel] += 1
+                if policy == POLICY_DROP_NEW or not queue:
+                    return
+                queue.popleft()
+                self._total -= 1
+
+            if not queue:
+                self._ready.append(channel)
+            queue.append((sender, event))
+            self._total += 1
+
+            if self._scheduled:
+                return
+            self._scheduled = True
+        self._loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        """Dispatch a batch of messages, one channel at a time."""
+        for _ in range(self._batch):
+            with self._lock:
+                if not self._ready:
+                    self._scheduled = False
+                    return
+                channel = self._ready.popleft()
+                queue = self._queues.get(channel)
+                if not queue:
+                    continue
+                sender, event = queue.popleft()
+                self._total -= 1
+                if queue:
+                    self._ready.append(channel)
+
+            try:
+                self.dispatch(sender, channel, event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error handling message on %s", channel)
+
+        # Let other work run before the next batch
+        self._loop.call_soon(self._drain)
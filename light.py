@@ -1,6 +1,7 @@
 """Platform for sensor integration."""
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Any
 
 from homeassistant.components.light import (
@@ -10,6 +11,7 @@ from homeassistant.components.light import (
     ATTR_RGB_COLOR,
     ATTR_RGBW_COLOR,
     ATTR_RGBWW_COLOR,
+    ATTR_TRANSITION,
     ATTR_WHITE,
     COLOR_MODE_BRIGHTNESS,
     COLOR_MODE_COLOR_TEMP,
@@ -19,6 +21,7 @@ from homeassistant.components.light import (
     COLOR_MODE_RGBWW,
     COLOR_MODE_WHITE,
     SUPPORT_EFFECT,
+    SUPPORT_TRANSITION,
     LightEntity,
     brightness_supported,
 )
@@ -27,7 +30,33 @@ import homeassistant.util.color as color_util
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
 # from . import async_create_new_platform_entity
-from .const import DOMAIN
+from .ack import oocsiAckTracker
+from .const import ACK_TIMEOUT, DOMAIN
+
+# Light state attributes set by a command, and the update fields reporting them
+LIGHT_FIELDS = (
+    "_channel_state",
+    "_rgb",
+    "_rgbw",
+    "_rgbww",
+    "_brightness",
+    "_color_temp",
+)
+REPORTED_FIELDS = {
+    "state": "_channel_state",
+    "colorrgb": "_rgb",
+    "colorrgbw": "_rgbw",
+    "colorrgbww": "_rgbww",
+    "brightness": "_brightness",
+    "white": "_brightness",
+    "color_temp": "_color_temp",
+}
+
+
+@lru_cache(maxsize=512)
+def _color_temperature_to_rgb(color_temp) -> tuple[float, float, float]:
+    """Return the cached RGB conversion of a colour temperature."""
+    return color_util.color_temperature_to_rgb(color_temp)
 
 
 # Handle platform
@@ -45,7 +74,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             hass, config_entry, api, BasicLight, async_add_entities, platform
         )
 
-    config_entry.async_on_unload(
+    oocsiGateway.async_on_unload(
         async_dispatcher_connect(
             hass,
             oocsiGateway._signal_new_light,
@@ -76,6 +105,10 @@ class BasicLight(LightEntity):
 
         self._attr_unique_id = self._property.channel_name
         self._channel_state = self._property.state
+        self._assumed_state = False
+        self._ack = oocsiAckTracker(hass, ACK_TIMEOUT)
+        # Fields of the last command the device has not reported yet
+        self._unconfirmed = set()
 
         # self._supportedFeature = entityProperty["type"]
 
@@ -92,6 +125,9 @@ class BasicLight(LightEntity):
         self._rgbww: tuple[int, int, int, int, int] | None = None
         self._supported_color_modes: set[str] | None = None
 
+        if self._property.transition:
+            self._supported_features |= SUPPORT_TRANSITION
+
         # if entityProperty.get("effect"):
         #     self._attr_supported_features |= SUPPORT_EFFECT
         #     self._effect: str | None = None
@@ -144,25 +180,52 @@ class BasicLight(LightEntity):
 
         @callback
         def channel_update_event(sender, recipient, event, **kwargs: Any):
-            """Handle oocsi event."""
+            """Merge a full or partial oocsi update into the current state."""
             supported_color_modes = self._supported_color_modes or set()
-            self._channel_state = event["state"]
-            if COLOR_MODE_RGB in supported_color_modes:
+            previous = self._light_state
+            # Devices may report only what changed, a command is acknowledged
+            # once every field it changed was reported
+            self._unconfirmed.difference_update(
+                REPORTED_FIELDS[key] for key in event if key in REPORTED_FIELDS
+            )
+            acknowledged = not self._unconfirmed and self._ack.acknowledge()
+            if acknowledged:
+                self._assumed_state = False
+            if "state" in event:
+                self._assumed_state = False
+                self._channel_state = event["state"]
+            if COLOR_MODE_RGB in supported_color_modes and "colorrgb" in event:
                 self._rgb = event["colorrgb"]
-            if COLOR_MODE_RGBW in supported_color_modes:
+            if COLOR_MODE_RGBW in supported_color_modes and "colorrgbw" in event:
                 self._rgbw = event["colorrgbw"]
-            if COLOR_MODE_RGBWW in supported_color_modes:
+            if COLOR_MODE_RGBWW in supported_color_modes and "colorrgbww" in event:
                 self._rgbww = event["colorrgbww"]
-            if brightness_supported(supported_color_modes):
+            if brightness_supported(supported_color_modes) and "brightness" in event:
                 self._brightness = event["brightness"]
-            if COLOR_MODE_COLOR_TEMP in supported_color_modes:
+            if COLOR_MODE_COLOR_TEMP in supported_color_modes and "color_temp" in event:
                 self._color_temp = event["color_temp"]
-            if COLOR_MODE_WHITE in supported_color_modes:
+            if COLOR_MODE_WHITE in supported_color_modes and "white" in event:
                 self._brightness = event["white"]
 
-            self.async_write_ha_state()
+            # Skip the state write when the update changed nothing
+            if acknowledged or self._light_state != previous:
+                self.async_write_ha_state()
 
-        self._oocsi.subscribe(self._property.channel_name, channel_update_event)
+        self.async_on_remove(self._property.subscribe(channel_update_event))
+        self.async_on_remove(self._ack.cancel)
+
+    @property
+    def _light_state(self):
+        """Return everything an oocsi update can change."""
+        return (
+            self._channel_state,
+            self._assumed_state,
+            self._rgb,
+            self._rgbw,
+            self._rgbww,
+            self._brightness,
+            self._color_temp,
+        )
 
     @property
     def color_mode(self) -> str | None:
@@ -258,6 +321,16 @@ class BasicLight(LightEntity):
         """Flag supported features."""
         return self._supported_features
 
+    @property
+    def assumed_state(self) -> bool:
+        """Return true if the last command was never acknowledged."""
+        return self._assumed_state
+
+    @property
+    def extra_state_attributes(self):
+        """Return the acknowledgement metrics."""
+        return self._ack.attributes
+
     @property
     def is_on(self):
         """Return true if the switch is on."""
@@ -266,6 +339,7 @@ class BasicLight(LightEntity):
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
         lightsettings = {}
+        previous = self._snapshot()
         self._channel_state = True
         lightsettings["state"] = True
         supported_color_modes = self._supported_color_modes or set()
@@ -273,7 +347,6 @@ class BasicLight(LightEntity):
         if ATTR_RGB_COLOR in kwargs and COLOR_MODE_RGB in supported_color_modes:
             self._color_mode = COLOR_MODE_RGB
             self._rgb = kwargs.get(ATTR_RGB_COLOR)
-            self._oocsi.send(self._property.channel_name, {"colorrgb": self._rgb})
             lightsettings["colorrgb"] = self._rgb
             lightsettings["brightness"] = self._brightness
 
@@ -302,7 +375,7 @@ class BasicLight(LightEntity):
             self._color_temp = kwargs[ATTR_COLOR_TEMP]
 
             if self._property.led_type in ["RGB", "RGBW"]:
-                ct_in_rgb = color_util.color_temperature_to_rgb(kwargs[ATTR_COLOR_TEMP])
+                ct_in_rgb = _color_temperature_to_rgb(kwargs[ATTR_COLOR_TEMP])
                 lightsettings["colorTempInRGB"] = ct_in_rgb
 
             elif self._property.led_type in ["CCT", "RGBWW"]:
@@ -312,10 +385,46 @@ class BasicLight(LightEntity):
             self._effect = kwargs[ATTR_EFFECT]
             lightsettings["effect"] = self._effect
 
-        self._oocsi.send(self._property.channel_name, lightsettings)
-        self.async_write_ha_state()
+        if ATTR_TRANSITION in kwargs and self._supported_features & SUPPORT_TRANSITION:
+            lightsettings["transition"] = kwargs[ATTR_TRANSITION]
+
+        self._send(lightsettings, previous)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        self._oocsi.send(self._property.channel_name, {"state": False})
+        lightsettings = {"state": False}
+        if ATTR_TRANSITION in kwargs and self._supported_features & SUPPORT_TRANSITION:
+            lightsettings["transition"] = kwargs[ATTR_TRANSITION]
+        previous = self._snapshot()
         self._channel_state = False
+        self._send(lightsettings, previous)
+
+    def _snapshot(self):
+        """Return the state a command may change, to restore it without echo."""
+        snapshot = {field: getattr(self, field) for field in LIGHT_FIELDS}
+        snapshot["_color_mode"] = self._color_mode
+        return snapshot
+
+    def _send(self, lightsettings, previous):
+        """Send a command and wait for the device to report what it changed.
+
+        Fields the device has not reported when the acknowledgement times
+        out are rolled back, a command that changed nothing is acknowledged
+        by any update.
+        """
+        self._oocsi.send(self._property.channel_name, lightsettings)
+        self._unconfirmed = {
+            field for field in LIGHT_FIELDS if getattr(self, field) != previous[field]
+        }
+
+        @callback
+        def rollback():
+            for field in self._unconfirmed:
+                setattr(self, field, previous[field])
+            self._unconfirmed = set()
+            self._color_mode = previous["_color_mode"]
+            self._assumed_state = True
+            self.async_write_ha_state()
+
+        self._ack.start(None, rollback)
+        self.async_write_ha_state()
@@ -22,10 +22,10 @@ async def async_setup_entry(
         platform = "number"
 
         await oocsiGateway.async_create_new_platform_entity(
-            hass, BasicNumber, async_add_entities, platform
+            hass, config_entry, api, BasicNumber, async_add_entities, platform
         )
 
-    config_entry.async_on_unload(
+    oocsiGateway.async_on_unload(
         async_dispatcher_connect(
             hass,
             oocsiGateway._signal_new_number,
@@ -50,8 +50,8 @@ class BasicNumber(NumberEntity):
         self._channel_value = self._property.value
         self._attr_unit_of_measurement = self._property.unit
 
-        if "logo" in entityProperty:
-            self._icon = entityProperty["logo"]
+        if self._property.icon is not None:
+            self._icon = self._property.icon
         else:
             self._icon = "mdi:dialpad"
 
@@ -61,10 +61,11 @@ class BasicNumber(NumberEntity):
         @callback
         def channel_update_event(sender, recipient, event):
             """Execute Oocsi state change."""
-            self._channel_value = event["value"]
-            self.async_write_ha_state()
+            if "value" in event and event["value"] != self._channel_value:
+                self._channel_value = event["value"]
+                self.async_write_ha_state()
 
-        self._oocsi.subscribe(self._property.channel_name, channel_update_event)
+        self.async_on_remove(self._property.subscribe(channel_update_event))
 
     @property
     def name(self):
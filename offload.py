@@ -0,0 +1,104 @@
+"""Convert large payloads in a worker pool, off the event loop."""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import threading
+import time
+
+from homeassistant.core import callback
+
+_LOGGER = logging.getLogger(__name__)
+
+_worker = threading.local()
+
+
+def _init_worker() -> None:
+    _worker.active = True
+
+
+def yield_worker() -> None:
+    """Let a waiting thread take the GIL, when called from a conversion worker.
+
+    Converters that hold the GIL for long, like NumPy conversions, call this
+    in between chunks of work so the event loop is not held up meanwhile.
+    """
+    if getattr(_worker, "active", False):
+        time.sleep(0)
+
+
+def payload_size(event) -> int:
+    """Estimate the size of a payload by its number of elements."""
+    size = len(event)
+    for value in event.values():
+        if isinstance(value, (list, dict, str)):
+            size += len(value)
+    return size
+
+
+class oocsiPayloadOffload:
+    """Run channel converters in threads for payloads over a size threshold.
+
+    Results are delivered on the event loop in the order the messages of a
+    channel arrived, whether they were converted inline or in a worker.
+    """
+
+    def __init__(self, loop, threshold: int, workers: int) -> None:
+        self._loop = loop
+        self._threshold = threshold
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="oocsi_convert",
+            initializer=_init_worker,
+        )
+        self._pending = {}
+        self.offloaded = 0
+
+    @callback
+    def run(self, channel, convert, event, deliver) -> None:
+        """Convert event and pass the result to deliver."""
+        queue = self._pending.get(channel)
+        if not queue and payload_size(event) < self._threshold:
+            deliver(convert(event))
+            return
+
+        if queue is None:
+            queue = self._pending[channel] = deque()
+        if payload_size(event) < self._threshold:
+            # Wait behind the offloaded messages of this channel
+            future = self._loop.create_future()
+            future.set_result(convert(event))
+        else:
+            future = self._loop.run_in_executor(self._executor, convert, event)
+            self.offloaded += 1
+        queue.append((future, deliver))
+        future.add_done_callback(lambda _: self._flush(channel))
+
+    @callback
+    def _flush(self, channel) -> None:
+        """Deliver the finished results at the head of a channel."""
+        queue = self._pending.get(channel)
+        while queue and queue[0][0].done():
+            future, deliver = queue.popleft()
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                _LOGGER.error(
+                    "Error converting payload on %s: %s", channel, future.exception()
+                )
+                continue
+            deliver(future.result())
+        if queue is not None and not queue:
+            del self._pending[channel]
+
+    @callback
+    def remove(self, channel) -> None:
+        """Drop the pending results of a channel."""
+        for future, _ in self._pending.pop(channel, ()):
+            future.cancel()
+
+    def shutdown(self) -> None:
+        """Stop the workers, dropping conversions that did not start."""
+        self._pending.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
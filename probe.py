@@ -0,0 +1,104 @@
+"""Round-trip latency probe for the oocsi server."""
+from __future__ import annotations
+
+from collections import deque
+from datetime import timedelta
+import logging
+import math
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import MIN_PROBE_INTERVAL, PROBE_TIMEOUT, PROBE_WINDOW
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def percentile(values, fraction):
+    """Return the nearest-rank percentile of sorted values."""
+    if not values:
+        return None
+    return values[max(0, math.ceil(fraction * len(values)) - 1)]
+
+
+class oocsiLinkProbe:
+    """Send probe messages to the client itself and track their round trip.
+
+    The server does not echo channel messages back to their sender, but it
+    does deliver messages addressed to a client's own handle.
+    """
+
+    def __init__(self, hass: HomeAssistant, gateway, interval: float) -> None:
+        self._hass = hass
+        self._gateway = gateway
+        self._interval = max(interval, MIN_PROBE_INTERVAL)
+        self._entry_id = gateway.entry.entry_id
+        self.signal_update = f"oocsi_link_update_{gateway.entry.entry_id}"
+
+        self._sequence = 0
+        self._outstanding = {}
+        # Round trip times in ms, None for probes that never came back
+        self._window = deque(maxlen=PROBE_WINDOW)
+        self._unsubs: list[CALLBACK_TYPE] = []
+        self.stats = {"p50": None, "p95": None, "max": None, "loss": None}
+
+    @callback
+    def async_start(self) -> None:
+        """Listen for probes on the client handle and start probing."""
+        self._unsubs.append(
+            self._gateway.subscribe(self._gateway.handle, self._handle_echo)
+        )
+        self._unsubs.append(
+            async_track_time_interval(
+                self._hass, self._async_probe, timedelta(seconds=self._interval)
+            )
+        )
+
+    @callback
+    def async_stop(self) -> None:
+        """Stop probing."""
+        while self._unsubs:
+            self._unsubs.pop()()
+        self._outstanding.clear()
+
+    @callback
+    def _async_probe(self, _now) -> None:
+        now = time.monotonic()
+        for sequence, sent in list(self._outstanding.items()):
+            if now - sent > PROBE_TIMEOUT:
+                del self._outstanding[sequence]
+                self._window.append(None)
+                _LOGGER.debug("Probe %s of %s was lost", sequence, self._entry_id)
+
+        self._sequence += 1
+        self._outstanding[self._sequence] = now
+        # The handle may follow a failover, and is shared by entries on a server
+        self._gateway.send(
+            self._gateway.handle, {"probe": self._sequence, "entry": self._entry_id}
+        )
+        self._update_stats()
+
+    @callback
+    def _handle_echo(self, sender, recipient, event) -> None:
+        if event.get("entry") != self._entry_id:
+            return
+        sent = self._outstanding.pop(event.get("probe"), None)
+        if sent is None:
+            return
+        self._window.append(round((time.monotonic() - sent) * 1000, 2))
+        self._update_stats()
+
+    @callback
+    def _update_stats(self) -> None:
+        if not self._window:
+            return
+        rtts = sorted(rtt for rtt in self._window if rtt is not None)
+        self.stats = {
+            "p50": percentile(rtts, 0.5),
+            "p95": percentile(rtts, 0.95),
+            "max": rtts[-1] if rtts else None,
+            "loss": round(100 * (len(self._window) - len(rtts)) / len(self._window), 1),
+        }
+        async_dispatcher_send(self._hass, self.signal_update)
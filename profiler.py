@@ -0,0 +1,60 @@
+"""On-demand profiling of the gateway message dispatch."""
+from __future__ import annotations
+
+from collections import Counter
+import cProfile
+import io
+import pstats
+import time
+
+
+def handler_name(handler) -> str:
+    """Return a readable name of a channel handler."""
+    owner = getattr(handler, "__self__", None)
+    if owner is not None:
+        return f"{type(owner).__name__}.{handler.__name__}"
+    return getattr(handler, "__qualname__", repr(handler))
+
+
+class oocsiDispatchProfiler:
+    """Profile channel handlers and total their time per channel and handler."""
+
+    def __init__(self) -> None:
+        self._profile = cProfile.Profile()
+        self.channel_time = Counter()
+        self.handler_time = Counter()
+        self.messages = Counter()
+
+    def run(self, handler, sender, recipient, event) -> None:
+        """Run one handler under the profiler."""
+        start = time.perf_counter()
+        self._profile.enable()
+        try:
+            handler(sender, recipient, event)
+        finally:
+            self._profile.disable()
+            elapsed = time.perf_counter() - start
+            self.channel_time[recipient] += elapsed
+            self.handler_time[handler_name(handler)] += elapsed
+            self.messages[recipient] += 1
+
+    def dump(self, path: str) -> None:
+        """Write the collected profile to path."""
+        self._profile.dump_stats(path)
+
+    def summary(self, top: int) -> str:
+        """Return the top channels, handlers and functions as text."""
+        lines = ["Cumulative time per channel (ms, messages):"]
+        for channel, seconds in self.channel_time.most_common(top):
+            lines.append(
+                f"  {channel}: {seconds * 1000:.2f} ({self.messages[channel]})"
+            )
+        lines.append("Cumulative time per handler (ms):")
+        for name, seconds in self.handler_time.most_common(top):
+            lines.append(f"  {name}: {seconds * 1000:.2f}")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profile, stream=stream)
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(top)
+        lines.append(stream.getvalue())
+        return "\n".join(lines)
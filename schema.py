@@ -0,0 +1,145 @@
+"""Validation of oocsi interview components."""
+from __future__ import annotations
+
+from collections import OrderedDict
+import json
+import logging
+
+import voluptuous as vol
+
+import homeassistant.helpers.config_validation as cv
+
+from .const import INTERVIEW_CACHE_SIZE
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _ordered_pair(value):
+    """Check that a min_max pair is ascending."""
+    if value[0] > value[1]:
+        raise vol.Invalid("min_max must be [minimum, maximum]")
+    return value
+
+
+def _cct_needs_min_max(value):
+    """Check that colour temperature lamps give their mired range."""
+    if value.get("led_type") == "CCT" and "min_max" not in value:
+        raise vol.Invalid("CCT lights need a min_max mired range")
+    return value
+
+
+MIN_MAX = vol.All([vol.Coerce(float)], vol.Length(min=2, max=2), _ordered_pair)
+
+BASE_SCHEMA = vol.Schema(
+    {
+        vol.Required("channel_name"): cv.string,
+        vol.Required("type"): cv.string,
+        vol.Optional("icon"): vol.Any(None, cv.string),
+        vol.Optional("unit"): vol.Any(None, cv.string),
+    },
+    extra=vol.ALLOW_EXTRA,
+)
+
+# Compiled once at import, one schema per component type
+COMPONENT_SCHEMAS = {
+    "binary_sensor": BASE_SCHEMA.extend(
+        {
+            vol.Optional("sensor_type", default=None): vol.Any(None, cv.string),
+            vol.Optional("state", default=False): cv.boolean,
+            vol.Optional("debounce"): cv.positive_float,
+            vol.Optional("debounce_rising"): cv.positive_float,
+            vol.Optional("debounce_falling"): cv.positive_float,
+        }
+    ),
+    "light": vol.All(
+        BASE_SCHEMA.extend(
+            {
+                vol.Optional("state", default=False): cv.boolean,
+                vol.Required("led_type"): vol.In(
+                    ["RGB", "RGBW", "RGBWW", "WHITE", "CCT", "DIMMABLE", "ONOFF"]
+                ),
+                vol.Optional("spectrum", default=[]): [cv.string],
+                vol.Optional("min_max"): MIN_MAX,
+                vol.Optional("brightness"): vol.Any(None, vol.Coerce(int)),
+            }
+        ),
+        _cct_needs_min_max,
+    ),
+    "number": BASE_SCHEMA.extend(
+        {
+            vol.Required("min_max"): MIN_MAX,
+            vol.Optional("step"): vol.Any(None, vol.Coerce(float)),
+            vol.Optional("value"): vol.Any(None, vol.Coerce(float)),
+        }
+    ),
+    "sensor": BASE_SCHEMA.extend(
+        {
+            vol.Optional("sensor_type", default=None): vol.Any(None, cv.string),
+            vol.Optional("aggregate_window"): vol.All(
+                vol.Coerce(int), vol.Range(min=1, max=100000)
+            ),
+            vol.Optional("aggregate_interval"): vol.All(
+                vol.Coerce(float), vol.Range(min=0.1)
+            ),
+        }
+    ),
+    "switch": BASE_SCHEMA.extend({vol.Optional("state", default=False): cv.boolean}),
+}
+
+
+class oocsiInterviewValidator:
+    """Validate interview components, caching results by content.
+
+    The cache is LRU bounded, as components carrying a changing state or
+    value add an entry for every new value.
+    """
+
+    def __init__(self, size: int = INTERVIEW_CACHE_SIZE) -> None:
+        self._size = size
+        self._cache = OrderedDict()
+        self.rejected = 0
+
+    def validate_device(self, device, interview):
+        """Return the interview with only its valid components, or None."""
+        try:
+            device_id = interview["properties"]["device_id"]
+            components = interview["components"]
+        except (KeyError, TypeError):
+            device_id = components = None
+        if device_id is None or not isinstance(components, dict):
+            self.rejected += 1
+            _LOGGER.warning("Ignored malformed interview of %s", device)
+            return None
+
+        valid = {}
+        for name, component in components.items():
+            descriptor = self._validate_component(device, name, component)
+            if descriptor is not None:
+                valid[name] = descriptor
+        return {**interview, "components": valid}
+
+    def _validate_component(self, device, name, component):
+        key = hash(json.dumps(component, sort_keys=True, default=str))
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        schema = COMPONENT_SCHEMAS.get(
+            component.get("type") if isinstance(component, dict) else None
+        )
+        if schema is None:
+            descriptor = None
+            _LOGGER.warning("Ignored %s of %s: unsupported type", name, device)
+        else:
+            try:
+                descriptor = schema(component)
+            except vol.Invalid as err:
+                descriptor = None
+                _LOGGER.warning("Ignored %s of %s: %s", name, device, err)
+
+        if descriptor is None:
+            self.rejected += 1
+        self._cache[key] = descriptor
+        if len(self._cache) > self._size:
+            self._cache.popitem(last=False)
+        return descriptor
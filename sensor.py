@@ -1,12 +1,16 @@
 """Platform for sensor integration."""
 from __future__ import annotations
 
-from homeassistant.components.sensor import SensorEntity
+from datetime import timedelta
+
+from homeassistant.components.sensor import STATE_CLASS_MEASUREMENT, SensorEntity
+from homeassistant.const import CONF_NAME, PERCENTAGE, TIME_MILLISECONDS
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
-from homeassistant.helpers.device_registry import DeviceRegistry
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.helpers.entity import EntityCategory
+from homeassistant.helpers.event import async_track_time_interval
 
+from .aggregate import oocsiRingBuffer, samples_from_payload
 from .const import DOMAIN
 
 
@@ -23,7 +27,7 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             hass, config_entry, api, BasicSensor, async_add_entities, platform
         )
 
-    config_entry.async_on_unload(
+    oocsiGateway.async_on_unload(
         async_dispatcher_connect(
             hass,
             oocsiGateway._signal_new_sensor,
@@ -31,6 +35,21 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         )
     )
 
+    if oocsiGateway.probe is not None:
+        async_add_entities(
+            oocsiLinkSensor(oocsiGateway, key, name, unit)
+            for key, name, unit in LINK_SENSORS
+        )
+
+
+# Probe statistic, name suffix and unit of the link health sensors
+LINK_SENSORS = [
+    ("p50", "Latency p50", TIME_MILLISECONDS),
+    ("p95", "Latency p95", TIME_MILLISECONDS),
+    ("max", "Latency max", TIME_MILLISECONDS),
+    ("loss", "Packet loss", PERCENTAGE),
+]
+
 
 class BasicSensor(SensorEntity):
     """Basic oocsi sensor."""
@@ -43,16 +62,61 @@ class BasicSensor(SensorEntity):
         self._attr_unique_id = self._property.channel_name
         self._channel_value = self._property.value
 
+        # Rolling aggregate of high-rate channels, published at a fixed rate
+        self._aggregate = self._property.aggregate
+        self._samples = None
+        self._new_samples = False
+        self._summary = None
+        if self._aggregate is not None:
+            self._samples = oocsiRingBuffer(self._aggregate[0])
+
     async def async_added_to_hass(self) -> None:
         """Add oocsi event listener."""
 
         @callback
         def channel_update_event(sender, recipient, event):
             """Execute Oocsi state change."""
-            self._channel_value = event["value"]
-            self.async_write_ha_state()
+            if "value" in event and event["value"] != self._channel_value:
+                self._channel_value = event["value"]
+                self.async_write_ha_state()
+
+        @callback
+        def samples_update_event(sender, recipient, samples):
+            """Add samples, already converted to floats, to the window."""
+            if len(samples):
+                self._samples.extend(samples)
+                self._new_samples = True
+
+        if self._samples is None:
+            self.async_on_remove(self._property.subscribe(channel_update_event))
+        else:
+            # Large sample arrays are converted in a worker, off the loop
+            self.async_on_remove(
+                self._property.subscribe(samples_update_event, samples_from_payload)
+            )
+            self.async_on_remove(
+                async_track_time_interval(
+                    self.hass,
+                    self._async_publish_aggregate,
+                    timedelta(seconds=self._aggregate[1]),
+                )
+            )
+
+    @callback
+    def _async_publish_aggregate(self, _now) -> None:
+        """Write the window summary if samples arrived since the last one."""
+        if not self._new_samples:
+            return
+        self._new_samples = False
+        self._summary = self._samples.summary()
+        self._channel_value = round(self._summary["mean"], 4)
+        self.async_write_ha_state()
 
-        self._oocsi.subscribe(self._property.channel_name, channel_update_event)
+    @property
+    def extra_state_attributes(self):
+        """Return the window statistics of aggregating sensors."""
+        if self._summary is not None:
+            return {**self._summary, "samples": len(self._samples)}
 
     @property
     def device_class(self) -> str:
@@ -94,3 +158,38 @@ class BasicSensor(SensorEntity):
     def state(self):
         """Return true if the switch is on."""
         return self._channel_value
+
+
+class oocsiLinkSensor(SensorEntity):
+    """Link health of the oocsi server measured by the gateway probe."""
+
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_should_poll = False
+    _attr_state_class = STATE_CLASS_MEASUREMENT
+
+    def __init__(self, gateway, key, name, unit):
+        """Set the probe statistic this sensor shows."""
+        self._gateway = gateway
+        self._key = key
+        server_name = gateway.entry.data[CONF_NAME]
+        self._attr_name = f"{server_name} {name}"
+        self._attr_unique_id = f"{gateway.entry.entry_id}_link_{key}"
+        self._attr_native_unit_of_measurement = unit
+        self._attr_device_info = {
+            "identifiers": {(DOMAIN, server_name)},
+            "name": server_name,
+            "model": "OOCSI server",
+        }
+
+    async def async_added_to_hass(self) -> None:
+        """Update when the probe has new statistics."""
+        self.async_on_remove(
+            async_dispatcher_connect(
+                self.hass, self._gateway.probe.signal_update, self.async_write_ha_state
+            )
+        )
+
+    @property
+    def native_value(self):
+        """Return the probe statistic."""
+        return self._gateway.probe.stats[self._key]
@@ -0,0 +1,210 @@
+"""Services for Oocsi for HomeAssistant."""
+from __future__ import annotations
+
+import voluptuous as vol
+
+from homeassistant.const import CONF_NAME
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+import homeassistant.util.dt as dt_util
+from homeassistant.exceptions import HomeAssistantError
+import homeassistant.helpers.config_validation as cv
+
+from .const import (
+    CALL_TIMEOUT,
+    DOMAIN,
+    EVENT_CALL_RESPONSE,
+    EVENT_REPLAY_FINISHED,
+    PROFILE_TOP,
+    RECORD_BACKUP_COUNT,
+    RECORD_FILE,
+    RECORD_MAX_BYTES,
+    SERVICE_CALL,
+    SERVICE_REPLAY,
+    SERVICE_START_PROFILE,
+    SERVICE_START_RECORDING,
+    SERVICE_STOP_PROFILE,
+    SERVICE_STOP_RECORDING,
+)
+
+ATTR_CALL = "call"
+ATTR_CHANNEL = "channel"
+ATTR_BACKUP_COUNT = "backup_count"
+ATTR_DATA = "data"
+ATTR_MAX_BYTES = "max_bytes"
+ATTR_PATH = "path"
+ATTR_RESPONSE = "response"
+ATTR_SERVER = "server"
+ATTR_SPEED = "speed"
+ATTR_TIMEOUT = "timeout"
+ATTR_TO_SERVER = "to_server"
+ATTR_TOP = "top"
+
+CALL_SCHEMA = vol.Schema(
+    {
+        vol.Required(ATTR_CHANNEL): cv.string,
+        vol.Optional(ATTR_CALL): cv.string,
+        vol.Optional(ATTR_DATA, default={}): dict,
+        vol.Optional(ATTR_TIMEOUT, default=CALL_TIMEOUT): vol.All(
+            vol.Coerce(float), vol.Range(min=0.1, max=60)
+        ),
+        vol.Optional(ATTR_SERVER): cv.string,
+    }
+)
+
+START_RECORDING_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_MAX_BYTES, default=RECORD_MAX_BYTES): cv.positive_int,
+        vol.Optional(ATTR_BACKUP_COUNT, default=RECORD_BACKUP_COUNT): vol.All(
+            vol.Coerce(int), vol.Range(min=0, max=100)
+        ),
+        vol.Optional(ATTR_SERVER): cv.string,
+    }
+)
+
+STOP_RECORDING_SCHEMA = vol.Schema({vol.Optional(ATTR_SERVER): cv.string})
+
+REPLAY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_SPEED, default=1): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+        vol.Optional(ATTR_TO_SERVER, default=False): cv.boolean,
+        vol.Optional(ATTR_SERVER): cv.string,
+    }
+)
+
+START_PROFILE_SCHEMA = vol.Schema({vol.Optional(ATTR_SERVER): cv.string})
+
+STOP_PROFILE_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_PATH): cv.string,
+        vol.Optional(ATTR_TOP, default=PROFILE_TOP): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=200)
+        ),
+        vol.Optional(ATTR_SERVER): cv.string,
+    }
+)
+
+
+def get_gateway(hass: HomeAssistant, server: str | None = None):
+    """Return the gateway of the named server, or the first one."""
+    for gateway in hass.data[DOMAIN]["GATEWAY"].values():
+        if server is None or gateway.entry.data[CONF_NAME] == server:
+            return gateway
+    raise HomeAssistantError(f"Unknown oocsi server {server}")
+
+
+@callback
+def async_register_services(hass: HomeAssistant) -> None:
+    """Register the oocsi services."""
+
+    async def async_call(service: ServiceCall) -> None:
+        """Call an oocsi responder and fire its response as an event."""
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        channel = service.data[ATTR_CHANNEL]
+        response = await gateway.async_call(
+            channel,
+            service.data[ATTR_DATA],
+            service.data[ATTR_TIMEOUT],
+            call_name=service.data.get(ATTR_CALL),
+        )
+        hass.bus.async_fire(
+            EVENT_CALL_RESPONSE,
+            {
+                ATTR_CHANNEL: channel,
+                ATTR_CALL: service.data.get(ATTR_CALL, channel),
+                ATTR_RESPONSE: response,
+            },
+        )
+
+    def get_path(service: ServiceCall) -> str:
+        path = service.data.get(ATTR_PATH, hass.config.path(RECORD_FILE))
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Path {path} is not allowed")
+        return path
+
+    async def async_start_recording(service: ServiceCall) -> None:
+        """Record received oocsi traffic to a file."""
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        await gateway.async_start_recording(
+            get_path(service),
+            service.data[ATTR_MAX_BYTES],
+            service.data[ATTR_BACKUP_COUNT],
+        )
+
+    async def async_stop_recording(service: ServiceCall) -> None:
+        """Stop recording oocsi traffic."""
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        await gateway.async_stop_recording()
+
+    async def async_replay_recording(service: ServiceCall) -> None:
+        """Replay a recording and fire its statistics as an event."""
+        from .traffic import async_replay
+
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        stats = await async_replay(
+            hass,
+            gateway,
+            get_path(service),
+            service.data[ATTR_SPEED],
+            service.data[ATTR_TO_SERVER],
+        )
+        hass.bus.async_fire(EVENT_REPLAY_FINISHED, stats)
+
+    async def async_start_profile(service: ServiceCall) -> None:
+        """Start profiling the oocsi message dispatch."""
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        gateway.async_start_profile()
+
+    async def async_stop_profile(service: ServiceCall) -> None:
+        """Stop profiling, write the profile and log the top entries."""
+        gateway = get_gateway(hass, service.data.get(ATTR_SERVER))
+        path = service.data.get(
+            ATTR_PATH,
+            hass.config.path(f"oocsi_profile_{dt_util.utcnow():%Y%m%d%H%M%S}.prof"),
+        )
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Path {path} is not allowed")
+        await gateway.async_stop_profile(path, service.data[ATTR_TOP])
+
+    hass.services.async_register(DOMAIN, SERVICE_CALL, async_call, schema=CALL_SCHEMA)
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_RECORDING,
+        async_start_recording,
+        schema=START_RECORDING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_STOP_RECORDING,
+        async_stop_recording,
+        schema=STOP_RECORDING_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_REPLAY, async_replay_recording, schema=REPLAY_SCHEMA
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_START_PROFILE,
+        async_start_profile,
+        schema=START_PROFILE_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN, SERVICE_STOP_PROFILE, async_stop_profile, schema=STOP_PROFILE_SCHEMA
+    )
+
+
+@callback
+def async_remove_services(hass: HomeAssistant) -> None:
+    """Remove the oocsi services once the last entry is unloaded."""
+    for service in (
+        SERVICE_CALL,
+        SERVICE_START_RECORDING,
+        SERVICE_STOP_RECORDING,
+        SERVICE_REPLAY,
+        SERVICE_START_PROFILE,
+        SERVICE_STOP_PROFILE,
+    ):
+        hass.services.async_remove(DOMAIN, service)
@@ -7,7 +7,8 @@ from homeassistant.components.switch import SwitchEntity
 from homeassistant.core import callback
 from homeassistant.helpers.dispatcher import async_dispatcher_connect
 
-from .const import DOMAIN
+from .ack import oocsiAckTracker
+from .const import ACK_TIMEOUT, DOMAIN
 
 
 async def async_setup_entry(hass, config_entry, async_add_entities):
@@ -23,13 +24,13 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
             hass, config_entry, api, BasicSwitch, async_add_entities, platform
         )
 
-        config_entry.async_on_unload(
-            async_dispatcher_connect(
-                hass,
-                oocsiGateway._signal_new_switch,
-                async_add_switch,
-            )
+    oocsiGateway.async_on_unload(
+        async_dispatcher_connect(
+            hass,
+            oocsiGateway._signal_new_switch,
+            async_add_switch,
         )
+    )
 
 
 class BasicSwitch(SwitchEntity):
@@ -43,7 +44,9 @@ class BasicSwitch(SwitchEntity):
         self._oocsi = self._property.oocsi_api()
         self._attr_unique_id = self._property.channel_name
         self._oocsichannel = self._property.channel_name
-        self._channel_state = self._propety.state
+        self._channel_state = self._property.state
+        self._assumed_state = False
+        self._ack = oocsiAckTracker(hass, ACK_TIMEOUT)
         # self._attr_device_info = {
         #     "name": entity_name,
         #     "manufacturer": entityProperty["creator"],
@@ -56,10 +59,20 @@ class BasicSwitch(SwitchEntity):
         @callback
         def channel_update_event(sender, recipient, event):
             """Update state on oocsi update."""
-            self._channel_state = event["state"]
-            self.async_write_ha_state()
-
-        self._oocsi.subscribe(self._property.channel_name, channel_update_event)
+            if "state" not in event:
+                return
+            acknowledged = self._ack.acknowledge(event["state"])
+            if (
+                acknowledged
+                or self._assumed_state
+                or event["state"] != self._channel_state
+            ):
+                self._assumed_state = False
+                self._channel_state = event["state"]
+                self.async_write_ha_state()
+
+        self.async_on_remove(self._property.subscribe(channel_update_event))
+        self.async_on_remove(self._ack.cancel)
 
     @property
     def name(self):
@@ -90,6 +103,12 @@ class BasicSwitch(SwitchEntity):
     @property
     def assumed_state(self) -> bool:
         """Return true if we do optimistic updates."""
+        return self._assumed_state
+
+    @property
+    def extra_state_attributes(self):
+        """Return the acknowledgement metrics."""
+        return self._ack.attributes
 
     @property
     def is_on(self):
@@ -98,10 +117,28 @@ class BasicSwitch(SwitchEntity):
 
     async def async_turn_on(self, **kwargs: Any) -> None:
         """Turn the entity on."""
-        self._oocsi.send(self._property.channel_name, {"state": True})
-        self._channel_state = True
+        self._async_send_state(True)
 
     async def async_turn_off(self, **kwargs: Any) -> None:
         """Turn the entity off."""
-        self._oocsi.send(self._property.channel_name, {"state": False})
-        self._channel_state = False
+        self._async_send_state(False)
+
+    @callback
+    def _async_send_state(self, state) -> None:
+        """Send and optimistically write a state, rolling back without echo."""
+        self._oocsi.send(self._property.channel_name, {"state": state})
+        previous = self._channel_state
+        self._channel_state = state
+        self._ack.start(state, self._rollback(previous))
+        self.async_write_ha_state()
+
+    def _rollback(self, previous):
+        """Return a callback restoring the state when no echo arrives."""
+
+        @callback
+        def rollback():
+            self._channel_state = previous
+            self._assumed_state = True
+            self.async_write_ha_state()
+
+        return rollback
@@ -0,0 +1,102 @@
+"""Fixtures for the oocsi integration tests."""
+
+from __future__ import annotations
+
+import importlib.util
+from pathlib import Path
+import sys
+import types
+
+import pytest
+from pytest_homeassistant_custom_component.common import MockConfigEntry
+
+from homeassistant.const import CONF_HOST, CONF_NAME, CONF_PORT
+
+# The repository root is the integration, load it as custom_components.oocsi
+ROOT = Path(__file__).parent.parent
+if "custom_components.oocsi" not in sys.modules:
+    sys.modules.setdefault("custom_components", types.ModuleType("custom_components"))
+    sys.modules["custom_components"].__path__ = []
+    _spec = importlib.util.spec_from_file_location(
+        "custom_components.oocsi",
+        ROOT / "__init__.py",
+        submodule_search_locations=[str(ROOT)],
+    )
+    _module = importlib.util.module_from_spec(_spec)
+    sys.modules[_spec.name] = _module
+    _spec.loader.exec_module(_module)
+
+from custom_components.oocsi import oocsiGateway  # noqa: E402
+from custom_components.oocsi.connection import oocsiConnection  # noqa: E402
+from custom_components.oocsi.const import DOMAIN  # noqa: E402
+
+
+class FakeOocsiClient:
+    """Stand-in for the oocsi client with the attributes the integration uses."""
+
+    def __init__(self, host="localhost", port=4444) -> None:
+        self.handle = "homeassistant"
+        self.server_address = (host, port)
+        self.receivers = {self.handle: [None]}
+        self.calls = {}
+        self.sent = []
+        self.subscribed = set()
+        self.connected = True
+
+    def subscribe(self, channel, callback):
+        self.subscribed.add(channel)
+        self.receivers.setdefault(channel, []).append(callback)
+
+    def unsubscribe(self, channel):
+        del self.receivers[channel]
+
+    def send(self, channel, data):
+        self.sent.append((channel, data))
+        # The server hands messages to their sender only when sent to its handle
+        if channel == self.handle:
+            self.deliver(channel, data, self.handle)
+
+    def stop(self):
+        self.connected = False
+
+    def reply(self, message_id, event):
+        """Answer a call as the oocsi receive thread would."""
+        self.calls[message_id]["response"] = {**event, "_MESSAGE_ID": message_id}
+
+    def deliver(self, channel, event, sender="device"):
+        """Deliver a message as the oocsi receive thread would."""
+        for receiver in list(self.receivers.get(channel, ())):
+            receiver(sender, channel, dict(event))
+
+
+@pytest.fixture
+def entry(hass):
+    """Return a config entry of a local oocsi server."""
+    entry = MockConfigEntry(
+        domain=DOMAIN,
+        title="oocsi",
+        data={CONF_NAME: "homeassistant", CONF_HOST: "localhost", CONF_PORT: 4444},
+    )
+    entry.add_to_hass(hass)
+    return entry
+
+
+@pytest.fixture
+def client():
+    """Return a fake oocsi client."""
+    return FakeOocsiClient()
+
+
+@pytest.fixture
+def connection(hass, client):
+    """Return a connection over the fake client, without fallback servers."""
+    return oocsiConnection(hass, client, FakeOocsiClient, [client.server_address])
+
+
+@pytest.fixture
+async def gateway(hass, entry, connection):
+    """Return a gateway on the fake connection."""
+    gateway = oocsiGateway(hass, entry, connection)
+    yield gateway
+    gateway.async_shutdown()
+    await hass.async_block_till_done()
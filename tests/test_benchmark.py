@@ -0,0 +1,196 @@
+"""Timing benchmarks, run with pytest -m benchmark -s."""
+
+from __future__ import annotations
+
+import asyncio
+from pathlib import Path
+import random
+import statistics
+import subprocess
+import sys
+from unittest.mock import Mock
+
+import pytest
+
+from custom_components.oocsi.aggregate import samples_from_payload
+from custom_components.oocsi.const import OFFLOAD_WORKERS
+from custom_components.oocsi.offload import oocsiPayloadOffload
+
+pytestmark = pytest.mark.benchmark
+
+ENTITIES = 1000
+LARGE = 1_000_000
+MESSAGES = 5
+
+ROOT = Path(__file__).parent.parent
+# Imports the integration as Home Assistant would, then the modules named on
+# the command line. Home Assistant itself is loaded first and not counted.
+IMPORT_SCRIPT = f"""
+import importlib.util, sys, types
+import homeassistant.config_entries
+sys.modules["custom_components"] = types.ModuleType("custom_components")
+sys.modules["custom_components"].__path__ = []
+spec = importlib.util.spec_from_file_location(
+    "custom_components.oocsi",
+    {str(ROOT / "__init__.py")!r},
+    submodule_search_locations=[{str(ROOT)!r}],
+)
+module = importlib.util.module_from_spec(spec)
+sys.modules[spec.name] = module
+spec.loader.exec_module(module)
+# The import statement, unlike importlib.import_module, is timed
+for name in sys.argv[1:]:
+    __import__(name)
+"""
+# What loading the integration imported before imports were deferred
+DEFERRED = [
+    "oocsi",
+    "numpy",
+    "custom_components.oocsi.profiler",
+    "custom_components.oocsi.schema",
+    "custom_components.oocsi.services",
+    "custom_components.oocsi.traffic",
+]
+
+
+async def test_time_to_correct_state(hass, gateway, client):
+    """Fetch the state of 1,000 entities, of which 5% never answer."""
+    loop = hass.loop
+    rng = random.Random(0)
+    channels = [f"lamp_{number}" for number in range(ENTITIES)]
+    silent = set(rng.sample(channels, ENTITIES // 20))
+
+    send = client.send
+
+    def answer(channel, data):
+        """Reply to state calls after 5 to 50 ms, as a device would."""
+        send(channel, data)
+        if "_MESSAGE_ID" in data and channel not in silent:
+            loop.call_later(
+                rng.uniform(0.005, 0.05),
+                client.reply,
+                data["_MESSAGE_ID"],
+                {"state": True},
+            )
+
+    client.send = answer
+    corrected = {}
+    start = loop.time()
+    for channel in channels:
+        gateway.subscribe(
+            channel,
+            lambda sender, recipient, event: corrected.setdefault(
+                recipient, loop.time() - start
+            ),
+        )
+
+    await gateway.async_fetch_initial_states(
+        [Mock(unique_id=channel) for channel in channels]
+    )
+    total = loop.time() - start
+    print(
+        f"\nTime to correct state of {len(corrected)} of {ENTITIES} entities: "
+        f"median {statistics.median(corrected.values()) * 1000:.0f} ms, "
+        f"last {max(corrected.values()) * 1000:.0f} ms, "
+        f"fetch done after {total * 1000:.0f} ms"
+    )
+    assert len(corrected) == ENTITIES - len(silent)
+    assert statistics.median(corrected.values()) < total / 2
+
+
+def _import_times(*modules):
+    """Return the -X importtime in ms of each module the integration loads.
+
+    Modules are listed by the top level import that loaded them, with the
+    time of their nested imports included.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_SCRIPT, *modules],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    lines = result.stderr.splitlines()
+    start = next(
+        index
+        for index, line in enumerate(lines)
+        if line.endswith("| homeassistant.config_entries")
+    )
+    times = {}
+    for line in lines[start + 1 :]:
+        _, cumulative, name = line.split("|")
+        if not name.startswith("  "):
+            times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def test_import_time():
+    """Report -X importtime of the integration, with and without deferring."""
+    before = [_import_times(*DEFERRED) for _ in range(5)]
+    after = [_import_times() for _ in range(5)]
+    before_total = statistics.median(sum(times.values()) for times in before)
+    after_total = statistics.median(sum(times.values()) for times in after)
+    print(
+        f"\nIntegration import time: before {before_total:.1f} ms, "
+        f"after {after_total:.1f} ms"
+    )
+    for module in DEFERRED:
+        deferred = statistics.median(times[module] for times in before)
+        print(f"  deferred {module}: {deferred:.1f} ms")
+    assert not set(DEFERRED) & set(after[0])
+    assert after_total < before_total
+
+
+async def _convert_all(hass, offload, payloads):
+    """Convert payloads as they arrive, return results and the longest loop stall."""
+    results = []
+    done = asyncio.Event()
+    stalls = []
+
+    def deliver(samples):
+        results.append(samples)
+        if len(results) == len(payloads):
+            done.set()
+
+    async def watch():
+        last = hass.loop.time()
+        while not done.is_set():
+            await asyncio.sleep(0)
+            now = hass.loop.time()
+            stalls.append(now - last)
+            last = now
+
+    watcher = asyncio.create_task(watch())
+    for payload in payloads:
+        offload.run("samples", samples_from_payload, payload, deliver)
+        # One message per loop iteration, as the inbound queue hands them out
+        await asyncio.sleep(0)
+    await done.wait()
+    await watcher
+    offload.shutdown()
+    offload._executor.shutdown(wait=True)
+    return results, max(stalls)
+
+
+async def test_large_payloads_block_the_loop_less(hass):
+    """Converting large payloads in workers keeps the loop responsive."""
+    payloads = [
+        {"value": [random.random() for _ in range(LARGE)]} for _ in range(MESSAGES)
+    ]
+    # Load NumPy before timing anything
+    samples_from_payload({"value": 1})
+
+    inline, inline_stall = await _convert_all(
+        hass, oocsiPayloadOffload(hass.loop, LARGE * 10, OFFLOAD_WORKERS), payloads
+    )
+    offloaded, offloaded_stall = await _convert_all(
+        hass, oocsiPayloadOffload(hass.loop, 1000, OFFLOAD_WORKERS), payloads
+    )
+    print(
+        f"\nLongest loop stall converting {MESSAGES} payloads of {LARGE} samples: "
+        f"inline {inline_stall * 1000:.1f} ms, "
+        f"offloaded {offloaded_stall * 1000:.1f} ms"
+    )
+    assert [len(samples) for samples in offloaded] == [LARGE] * MESSAGES
+    assert [samples[0] for samples in offloaded] == [samples[0] for samples in inline]
+    assert offloaded_stall < inline_stall / 2
@@ -0,0 +1,60 @@
+"""Tests for the oocsi binary sensor."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import async_fire_time_changed_exact
+
+from homeassistant.util import dt as dt_util
+
+from custom_components.oocsi import oocsiEntity
+from custom_components.oocsi.binary_sensor import BasicSensor
+
+
+def debounced_sensor(hass, gateway):
+    """Return a binary sensor with a one second settle time."""
+    interview = {
+        "channel_name": "motion",
+        "type": "binary_sensor",
+        "state": False,
+        "sensor_type": "motion",
+        "debounce": 1,
+    }
+    entity = oocsiEntity(
+        "motion", None, interview, gateway, ["id", "device", "oocsi"], gateway
+    )
+    sensor = BasicSensor(hass, entity)
+    sensor.hass = hass
+    sensor.entity_id = "binary_sensor.motion"
+    return sensor
+
+
+async def test_repeated_state_keeps_settling(hass, gateway):
+    """Republishing the pending state neither restarts the timer nor counts."""
+    sensor = debounced_sensor(hass, gateway)
+    start = dt_util.utcnow()
+
+    sensor._debounce_state(True)
+    for tenths in range(1, 8):
+        async_fire_time_changed_exact(hass, start + timedelta(seconds=tenths / 10))
+        sensor._debounce_state(True)
+    assert not sensor.is_on
+
+    async_fire_time_changed_exact(hass, start + timedelta(seconds=1.1))
+    await hass.async_block_till_done()
+    assert sensor.is_on
+    assert sensor.extra_state_attributes == {"suppressed_edges": 0}
+
+
+async def test_bounces_are_suppressed(hass, gateway):
+    """An edge that flips back before settling is counted and not written."""
+    sensor = debounced_sensor(hass, gateway)
+    start = dt_util.utcnow()
+
+    sensor._debounce_state(True)
+    sensor._debounce_state(False)
+    async_fire_time_changed_exact(hass, start + timedelta(seconds=2))
+    await hass.async_block_till_done()
+    assert not sensor.is_on
+    assert sensor.extra_state_attributes == {"suppressed_edges": 1}
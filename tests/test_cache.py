@@ -0,0 +1,72 @@
+"""Tests for the last known state cache."""
+
+from __future__ import annotations
+
+from custom_components.oocsi import oocsiEntity, oocsiGateway
+from custom_components.oocsi.cache import oocsiStateCache
+
+
+async def test_state_survives_reload(hass, entry, connection, client):
+    """A gateway built after a reload starts from the cached states."""
+    gateway = oocsiGateway(hass, entry, connection)
+    gateway.subscribe("lamp", lambda sender, recipient, event: None, retain=True)
+    client.deliver("lamp", {"state": True, "brightness": 80})
+    client.deliver("lamp", {"brightness": 90})
+    await hass.async_block_till_done()
+    gateway.async_shutdown()
+
+    received = []
+    gateway = oocsiGateway(hass, entry, connection)
+    gateway.subscribe(
+        "lamp", lambda sender, recipient, event: received.append(event), retain=True
+    )
+    assert received == [{"state": True, "brightness": 90}]
+    gateway.async_shutdown()
+
+
+async def test_snapshot_is_a_copy(hass):
+    """The snapshot does not change while cached states are updated."""
+    cache = oocsiStateCache(hass, "entry", 10)
+    cache.put("lamp", {"state": True})
+    snapshot = cache._snapshot()
+    cache.put("lamp", {"state": False})
+    assert snapshot == {"lamp": {"state": True}}
+
+
+async def test_persisted_snapshot_loaded_behind_newer_states(hass, hass_storage):
+    """Persisted states fill the cache without replacing fresher ones."""
+    hass_storage["oocsi.state_cache.entry"] = {
+        "version": 1,
+        "key": "oocsi.state_cache.entry",
+        "data": {"old": {"value": 1}, "lamp": {"state": False}},
+    }
+    # Persistence turned on in the options of a running entry
+    cache = oocsiStateCache(hass, "entry", 10)
+    cache.put("lamp", {"state": True})
+    cache.persist = True
+    await cache.async_load()
+    assert cache.get("lamp") == {"state": True}
+    assert cache.get("old") == {"value": 1}
+    assert list(cache._states) == ["lamp", "old"]
+
+
+async def test_aggregating_channels_not_retained(gateway, client):
+    """Sample payloads of aggregating sensors are not cached."""
+    for channel, extra in (("plain", {}), ("window", {"aggregate_window": 10})):
+        interview = {"channel_name": channel, "type": "sensor", **extra}
+        entity = oocsiEntity(
+            channel, None, interview, gateway, ["id", "device", "oocsi"], gateway
+        )
+        entity.subscribe(lambda sender, recipient, event: None)
+        gateway._dispatch(channel, channel, {"value": [1.0, 2.0]})
+    assert gateway.state_cache.get("plain") == {"value": [1.0, 2.0]}
+    assert gateway.state_cache.get("window") is None
+
+
+async def test_memory_includes_nested_values(hass):
+    """Memory use counts the samples inside list values."""
+    cache = oocsiStateCache(hass, "entry", 10)
+    for channel in range(5):
+        cache.put(channel, {"value": [float(sample) for sample in range(100_000)]})
+    # A float object alone takes 24 bytes, its list slot 8 more
+    assert cache.stats["memory_bytes"] > 5 * 100_000 * 32
@@ -0,0 +1,186 @@
+"""Tests for the shared oocsi connection."""
+
+from __future__ import annotations
+
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+from oocsi import OOCSIDisconnect
+import pytest
+
+from custom_components.oocsi.connection import (
+    async_connect,
+    oocsi_client_class,
+    oocsiConnection,
+)
+
+PRIMARY = ("primary", 4444)
+NEAR = ("near", 4444)
+FAR = ("far", 4444)
+LATENCIES = {PRIMARY: None, NEAR: 5.0, FAR: 50.0}
+
+
+async def probe(host, port):
+    """Return the made up latency of an endpoint."""
+    return LATENCIES[(host, port)]
+
+
+@patch("custom_components.oocsi.connection.async_probe_endpoint", probe)
+async def test_connect_to_fastest_healthy_server(hass, client):
+    """Down servers are skipped and the fastest one is tried first."""
+    client_factory = type(client)
+    client, endpoint = await async_connect(hass, client_factory, [PRIMARY, FAR, NEAR])
+    assert endpoint == NEAR
+    assert client.server_address == NEAR
+
+    def factory(host, port):
+        if (host, port) == NEAR:
+            raise OOCSIDisconnect("gone between probe and connect")
+        return client_factory(host, port)
+
+    _, endpoint = await async_connect(hass, factory, [PRIMARY, FAR, NEAR])
+    assert endpoint == FAR
+    assert await async_connect(hass, factory, [PRIMARY, NEAR]) is None
+
+
+@patch("custom_components.oocsi.connection.async_probe_endpoint", probe)
+async def test_failed_failover_can_be_retried(hass, client):
+    """A failover that cannot connect leaves the connection able to try again."""
+
+    def factory(host, port):
+        raise OOCSIDisconnect("down")
+
+    connection = oocsiConnection(hass, client, factory, [PRIMARY, NEAR, FAR], NEAR)
+    client.connected = False
+    await connection._async_check(None)
+    assert connection.client is client
+    assert not connection._switching
+
+    connection._client_factory = type(client)
+    connection.subscribe("lamp", lambda sender, recipient, event: None)
+    await connection._async_check(None)
+    assert connection.endpoint == NEAR
+    assert connection.client is not client
+    assert "lamp" in connection.client.subscribed
+    assert [switch["to"] for switch in connection.failovers] == [NEAR]
+    connection.stop()
+
+
+async def test_client_gives_up_on_unreachable_server(hass, socket_enabled):
+    """The client constructor raises at its timeout instead of spinning."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    threads = set(threading.enumerate())
+
+    start = time.monotonic()
+    with pytest.raises(OOCSIDisconnect):
+        await hass.async_add_executor_job(
+            lambda: oocsi_client_class()(
+                "test", "127.0.0.1", port, None, lambda message: None, 100, timeout=0.5
+            )
+        )
+    assert time.monotonic() - start < 2
+
+    # The abandoned connection thread stops after its reconnect delay
+    for thread in set(threading.enumerate()) - threads:
+        if type(thread).__name__ == "OOCSIThread":
+            thread.join(10)
+            assert not thread.is_alive()
+
+
+class StandInServer:
+    """Local server speaking enough of the oocsi protocol for a client."""
+
+    def __init__(self) -> None:
+        self.port = None
+        self.subscribed = set()
+        self._server = None
+        self._writers = set()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(
+            self._serve, "127.0.0.1", self.port or 0
+        )
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        self._server.close()
+        for writer in self._writers:
+            writer.close()
+        await self._server.wait_closed()
+
+    async def _serve(self, reader, writer):
+        self._writers.add(writer)
+        try:
+            # The client introduces itself and waits for a JSON welcome
+            if not await reader.readline():
+                return
+            writer.write(b'{"message": "welcome"}\n')
+            while line := (await reader.readline()).decode().strip():
+                if line == "quit":
+                    return
+                if line.startswith("subscribe "):
+                    self.subscribed.add(line.split(" ", 1)[1])
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+
+async def _until(condition):
+    for _ in range(500):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met in time")
+
+
+# The dropped client's thread raises once its reconnect attempts run out
+@pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+async def test_failover_between_local_servers(hass, socket_enabled):
+    """Fail over to a running server and return when the primary is back."""
+    primary, fallback = StandInServer(), StandInServer()
+    await primary.start()
+    await fallback.start()
+    endpoints = [("127.0.0.1", primary.port), ("127.0.0.1", fallback.port)]
+    threads = set(threading.enumerate())
+
+    def factory(host, port):
+        return oocsi_client_class()(
+            "homeassistant", host, port, None, lambda message: None, 1, timeout=2
+        )
+
+    client = await hass.async_add_executor_job(factory, *endpoints[0])
+    connection = oocsiConnection(hass, client, factory, endpoints)
+    connection.subscribe("lamp", lambda sender, recipient, event: None)
+    await _until(lambda: "lamp" in primary.subscribed)
+
+    await primary.stop()
+    await _until(lambda: not connection.client.connected)
+    await connection._async_check(None)
+    assert connection.endpoint == endpoints[1]
+    await _until(lambda: "lamp" in fallback.subscribed)
+    to_fallback = connection.failovers[-1]["duration_ms"]
+
+    primary.subscribed.clear()
+    await primary.start()
+    await connection._async_check(None)
+    assert connection.endpoint == endpoints[0]
+    await _until(lambda: "lamp" in primary.subscribed)
+    print(
+        f"\nFailover to the fallback took {to_fallback} ms, "
+        f"back to the primary {connection.failovers[-1]['duration_ms']} ms"
+    )
+
+    await hass.async_add_executor_job(connection.stop)
+    await primary.stop()
+    await fallback.stop()
+    for thread in set(threading.enumerate()) - threads:
+        if type(thread).__name__ == "OOCSIThread":
+            await hass.async_add_executor_job(thread.join, 10)
+            assert not thread.is_alive()
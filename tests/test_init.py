@@ -0,0 +1,202 @@
+"""Tests for the oocsi gateway."""
+
+from __future__ import annotations
+
+import asyncio
+import gc
+import logging
+from pathlib import Path
+import tracemalloc
+from unittest.mock import Mock
+import weakref
+
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+
+from custom_components.oocsi import oocsiEntity, oocsiGateway
+from custom_components.oocsi.const import POLICY_KEEP_ALL, POLICY_LATEST
+
+ROOT = Path(__file__).parent.parent
+
+
+def interview(device, device_id, channels):
+    """Return a heyOOCSI! message of a device with a switch per channel."""
+    return {
+        device: {
+            "properties": {"device_id": device_id},
+            "components": {
+                channel: {"channel_name": channel, "type": "switch", "state": False}
+                for channel in channels
+            },
+        }
+    }
+
+
+async def _reload(hass, entry, connection, client):
+    """Set up a gateway with devices and entities, then shut it down."""
+    gateway = oocsiGateway(hass, entry, connection)
+    await gateway.async_subscribe_heyOOCSI()
+    gateway.async_on_unload(
+        async_dispatcher_connect(hass, gateway._signal_new_switch, lambda info: None)
+    )
+    for number in range(5):
+        channels = [f"lamp_{number}_{index}" for index in range(4)]
+        client.deliver(
+            "heyOOCSI!", interview(f"lamp_{number}", f"id_{number}", channels)
+        )
+        for channel in channels:
+            gateway.subscribe(
+                channel, lambda sender, recipient, event: None, retain=True
+            )
+            client.deliver(channel, {"state": True})
+    await hass.async_block_till_done()
+    assert connection.subscription_count == 1 + 5 + 20
+
+    gateway.async_shutdown()
+    await hass.async_block_till_done()
+    return gateway
+
+
+async def test_reload_releases_everything(hass, entry, connection, client):
+    """Repeated reloads leave no subscriptions, listeners or gateways behind."""
+    for _ in range(10):
+        await _reload(hass, entry, connection, client)
+    # Records kept by the test's log capture would count as growth
+    logging.disable(logging.CRITICAL)
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        gateways = []
+        for _ in range(100):
+            gateway = await _reload(hass, entry, connection, client)
+            assert connection.subscription_count == 0
+            assert list(client.receivers) == [client.handle]
+            assert not hass.data.get("dispatcher", {}).get(gateway._signal_new_switch)
+            gateways.append(weakref.ref(gateway))
+        del gateway
+        gc.collect()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+        logging.disable(logging.NOTSET)
+    assert not [ref for ref in gateways if ref() is not None]
+
+    # Thread pools of the event loop grow on their own, count the integration
+    integration = [
+        tracemalloc.Filter(True, str(ROOT / "*.py")),
+        tracemalloc.Filter(False, str(ROOT / "tests" / "*")),
+    ]
+    growth = sum(
+        stat.size_diff
+        for stat in after.filter_traces(integration).compare_to(
+            before.filter_traces(integration), "filename"
+        )
+    )
+    assert growth < 16 * 1024
+
+
+async def test_stale_updates_dropped(gateway):
+    """Older and repeated updates are dropped, resets and odd values are not."""
+    stale = gateway._is_stale
+    assert not stale("seq", {"seq": 5})
+    assert stale("seq", {"seq": 4})
+    assert stale("seq", {"seq": 5})
+    assert not stale("seq", {"seq": 6})
+    # A uint8 counter wrapping around
+    assert not stale("seq", {"seq": 255})
+    assert not stale("seq", {"seq": 0})
+    assert gateway.stale_dropped == {"seq": 2}
+
+    # A clock stepping back is accepted after a few updates
+    assert not stale("ts", {"ts": 1000.0})
+    assert stale("ts", {"ts": 10.0})
+    assert stale("ts", {"ts": 11.0})
+    assert not stale("ts", {"ts": 12.0})
+    assert not stale("ts", {"ts": 13.0})
+
+    # Values that are not numbers are not ordered
+    assert not stale("ts", {"ts": "5"})
+    assert not stale("ts", {"ts": None})
+    assert not stale("ts", {"ts": 14.0})
+
+
+async def test_injected_messages_bypass_order_and_recorder(gateway):
+    """Replayed messages are neither dropped as stale nor recorded again."""
+    received = []
+    gateway.subscribe("lamp", lambda sender, recipient, event: received.append(event))
+    gateway._dispatch("lamp", "lamp", {"state": True, "seq": 9})
+
+    gateway.recorder = Mock()
+    gateway.async_inject("lamp", "lamp", {"state": False, "seq": 3})
+    assert received == [{"state": True, "seq": 9}, {"state": False, "seq": 3}]
+    gateway.recorder.record.assert_not_called()
+    gateway.recorder = None
+
+
+async def test_aggregating_sensors_keep_all_samples(gateway):
+    """Plain sensors keep only their latest message, aggregating ones keep all."""
+    for channel, extra in (("plain", {}), ("window", {"aggregate_window": 10})):
+        interview = {"channel_name": channel, "type": "sensor", **extra}
+        entity = oocsiEntity(
+            channel, None, interview, gateway, ["id", "device", "oocsi"], gateway
+        )
+        entity.subscribe(lambda sender, recipient, event: None)
+    assert gateway._inbound._policies == {
+        "plain": POLICY_LATEST,
+        "window": POLICY_KEEP_ALL,
+    }
+
+
+async def test_presence_subscribed_once_per_device(gateway, connection):
+    """Re-announcements do not add presence subscriptions."""
+    for announcement in range(1000):
+        number = announcement % 10
+        event = interview(f"lamp_{number}", f"id_{number}", [f"lamp_{number}"])
+        event[f"lamp_{number}"]["components"][f"lamp_{number}"]["state"] = bool(
+            announcement % 3
+        )
+        gateway._handle_interview_event(f"lamp_{number}", "heyOOCSI!", event)
+    assert connection.subscription_count == 10
+    assert len(gateway._presence) == 10
+
+
+async def test_leaving_device_is_fetched_again(hass, gateway, connection):
+    """A device that leaves and rejoins gets its state fetched again."""
+    gateway._handle_interview_event(
+        "lamp", "heyOOCSI!", interview("lamp", "id_lamp", ["lamp_1"])
+    )
+    gateway._fetched_channels.add("lamp_1")
+
+    gateway.handle_disconnection("id_lamp", "presence(id_lamp)", {"leave": "id_lamp"})
+    assert "lamp_1" not in gateway._fetched_channels
+    assert connection.subscription_count == 0
+
+
+async def test_fetched_state_overtaken_by_live_update(hass, gateway, client):
+    """A state reply older than a live update is not applied."""
+    received = {"lamp": [], "desk": []}
+    for channel in received:
+        gateway.subscribe(
+            channel,
+            lambda sender, recipient, event: received[recipient].append(event),
+            retain=True,
+        )
+    fetch = hass.async_create_task(
+        gateway.async_fetch_initial_states(
+            [Mock(unique_id="lamp"), Mock(unique_id="desk")]
+        )
+    )
+    while len(client.calls) < 2:
+        await asyncio.sleep(0)
+    calls = {channel: data["_MESSAGE_ID"] for channel, data in client.sent}
+
+    client.deliver("lamp", {"state": True})
+    while not received["lamp"]:
+        await asyncio.sleep(0)
+    client.reply(calls["lamp"], {"state": False})
+    client.reply(calls["desk"], {"state": True})
+    await fetch
+
+    assert received == {"lamp": [{"state": True}], "desk": [{"state": True}]}
+    assert gateway.state_cache.get("lamp") == {"state": True}
+    assert not gateway._fetching
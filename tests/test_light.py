@@ -0,0 +1,87 @@
+"""Tests for the oocsi light."""
+
+from __future__ import annotations
+
+from datetime import timedelta
+
+from pytest_homeassistant_custom_component.common import (
+    async_fire_time_changed_exact,
+)
+
+from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_RGB_COLOR
+from homeassistant.util import dt as dt_util
+
+from custom_components.oocsi import oocsiEntity
+from custom_components.oocsi.const import ACK_TIMEOUT
+from custom_components.oocsi.light import BasicLight
+
+
+async def rgb_light(hass, gateway, state=False):
+    """Return an RGB light at brightness 100."""
+    interview = {
+        "channel_name": "strip",
+        "type": "light",
+        "state": state,
+        "led_type": "RGB",
+        "spectrum": ["RGB"],
+        "brightness": 100,
+    }
+    entity = oocsiEntity(
+        "strip", None, interview, gateway, ["id", "device", "oocsi"], gateway
+    )
+    light = BasicLight(hass, entity)
+    light.hass = hass
+    light.entity_id = "light.strip"
+    await light._color_setup()
+    await light.async_added_to_hass()
+    return light
+
+
+async def test_unacknowledged_turn_on_rolls_back(hass, gateway, client):
+    """Without an echo, the optimistic colour and brightness are undone too."""
+    light = await rgb_light(hass, gateway)
+    start = dt_util.utcnow()
+
+    await light.async_turn_on(**{ATTR_RGB_COLOR: (255, 0, 0), ATTR_BRIGHTNESS: 200})
+    assert client.sent[-1] == (
+        "strip",
+        {"state": True, "colorrgb": (255, 0, 0), "brightness": 200},
+    )
+    assert (light.is_on, light.rgb_color, light.brightness) == (True, (255, 0, 0), 200)
+
+    async_fire_time_changed_exact(hass, start + timedelta(seconds=ACK_TIMEOUT + 1))
+    await hass.async_block_till_done()
+    assert (light.is_on, light.rgb_color, light.brightness) == (False, None, 100)
+    assert light.assumed_state
+
+
+async def test_partial_echo_acknowledges(hass, gateway, client):
+    """A lamp that is on acknowledges a brightness change by reporting it."""
+    light = await rgb_light(hass, gateway, state=True)
+    start = dt_util.utcnow()
+
+    await light.async_turn_on(**{ATTR_BRIGHTNESS: 200})
+    client.deliver("strip", {"brightness": 200})
+    await hass.async_block_till_done()
+    assert light._ack.acknowledged == 1
+
+    async_fire_time_changed_exact(hass, start + timedelta(seconds=ACK_TIMEOUT + 1))
+    await hass.async_block_till_done()
+    assert (light.is_on, light.brightness) == (True, 200)
+    assert not light.assumed_state
+
+
+async def test_reported_fields_survive_rollback(hass, gateway, client):
+    """Only fields the device has not reported are rolled back."""
+    light = await rgb_light(hass, gateway)
+    start = dt_util.utcnow()
+
+    await light.async_turn_on(**{ATTR_RGB_COLOR: (255, 0, 0), ATTR_BRIGHTNESS: 200})
+    client.deliver("strip", {"brightness": 200})
+    await hass.async_block_till_done()
+    assert light._ack.acknowledged == 0
+
+    async_fire_time_changed_exact(hass, start + timedelta(seconds=ACK_TIMEOUT + 1))
+    await hass.async_block_till_done()
+    assert (light.is_on, light.rgb_color, light.brightness) == (False, None, 200)
+    assert light.assumed_state
@@ -0,0 +1,44 @@
+"""Tests for the oocsi number."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.oocsi import number
+from custom_components.oocsi.const import DOMAIN
+
+
+async def test_interviewed_number_is_created(hass, entry, connection, gateway):
+    """A number passing the interview schema becomes an entity."""
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = connection
+    hass.data[DOMAIN]["GATEWAY"] = {entry.entry_id: gateway}
+    added = []
+    await number.async_setup_entry(hass, entry, added.extend)
+
+    gateway._handle_interview_event(
+        "dial",
+        "heyOOCSI!",
+        {
+            "dial": {
+                "properties": {"device_id": "id_dial"},
+                "components": {
+                    "volume": {
+                        "channel_name": "volume",
+                        "type": "number",
+                        "min_max": [0, 10],
+                        "icon": "volume-high",
+                    }
+                },
+            }
+        },
+    )
+    for _ in range(100):
+        if added:
+            break
+        await asyncio.sleep(0)
+
+    assert len(added) == 1
+    assert isinstance(added[0], number.BasicNumber)
+    assert added[0].unique_id == "volume"
+    assert added[0].icon == "mdi:volume-high"
+    hass.data.pop(DOMAIN)
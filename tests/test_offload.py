@@ -0,0 +1,54 @@
+"""Tests for the payload offload."""
+
+from __future__ import annotations
+
+import asyncio
+
+from custom_components.oocsi.aggregate import oocsiRingBuffer, samples_from_payload
+from custom_components.oocsi.const import OFFLOAD_WORKERS
+from custom_components.oocsi.offload import oocsiPayloadOffload
+
+
+async def _convert(hass, threshold, payloads):
+    """Convert payloads of one channel, return the results and the offload."""
+    offload = oocsiPayloadOffload(hass.loop, threshold, OFFLOAD_WORKERS)
+    results = []
+    done = asyncio.Event()
+
+    def deliver(samples):
+        results.append(list(samples))
+        if len(results) == len(payloads):
+            done.set()
+
+    for payload in payloads:
+        offload.run("samples", samples_from_payload, payload, deliver)
+    await done.wait()
+    offload.shutdown()
+    offload._executor.shutdown(wait=True)
+    return results, offload
+
+
+async def test_order_kept_across_workers(hass):
+    """Large payloads go to a worker, results keep their arrival order."""
+    payloads = [
+        {"value": [float(index)] * size}
+        for index, size in enumerate((1, 500, 2, 800, 3, 4))
+    ]
+    inline, inline_offload = await _convert(hass, 10_000, payloads)
+    offloaded, offload = await _convert(hass, 100, payloads)
+
+    assert offloaded == inline
+    assert [samples[0] for samples in offloaded] == [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    assert (inline_offload.offloaded, offload.offloaded) == (0, 2)
+
+
+def test_ring_buffer_extend_wraps():
+    """Extending past the end keeps exactly the newest samples."""
+    buffer = oocsiRingBuffer(5)
+    buffer.extend(samples_from_payload({"value": [1.0, 2.0, 3.0]}))
+    buffer.extend(samples_from_payload({"value": [4.0, 5.0, 6.0, 7.0]}))
+
+    assert len(buffer) == 5
+    assert buffer.summary()["min"] == 3.0
+    assert buffer.summary()["max"] == 7.0
+    assert buffer.summary()["mean"] == 5.0
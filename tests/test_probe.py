@@ -0,0 +1,31 @@
+"""Tests for the oocsi link probe."""
+
+from __future__ import annotations
+
+from custom_components.oocsi.probe import oocsiLinkProbe, percentile
+
+
+def test_percentile():
+    """Percentiles use the nearest rank."""
+    assert percentile([], 0.5) is None
+    assert percentile([1, 2, 3, 4], 0.5) == 2
+    assert percentile(list(range(1, 101)), 0.95) == 95
+
+
+async def test_probe_round_trip(hass, gateway, client):
+    """Probes sent to the client's own handle come back and are measured."""
+    probe = oocsiLinkProbe(hass, gateway, 30)
+    probe.async_start()
+    assert client.handle not in client.subscribed
+
+    for _ in range(3):
+        probe._async_probe(None)
+        await hass.async_block_till_done()
+    assert probe.stats["loss"] == 0
+    assert probe.stats["p50"] is not None
+
+    # Probes of another entry on the same server are ignored
+    client.send(client.handle, {"probe": 4, "entry": "other"})
+    await hass.async_block_till_done()
+    assert probe._outstanding == {}
+    probe.async_stop()
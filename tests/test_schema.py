@@ -0,0 +1,61 @@
+"""Tests for the interview validation."""
+
+from __future__ import annotations
+
+from custom_components.oocsi.schema import oocsiInterviewValidator
+
+
+def device(components):
+    """Return an interview of a device with components."""
+    return {"properties": {"device_id": "id"}, "components": components}
+
+
+def test_defaults_for_optional_fields():
+    """Components without a state or sensor type get defaults entities rely on."""
+    interview = oocsiInterviewValidator().validate_device(
+        "device",
+        device(
+            {
+                "switch": {"channel_name": "switch", "type": "switch"},
+                "sensor": {"channel_name": "sensor", "type": "sensor"},
+            }
+        ),
+    )
+    assert interview["components"]["switch"]["state"] is False
+    assert interview["components"]["sensor"]["sensor_type"] is None
+
+
+def test_invalid_components_rejected_one_by_one():
+    """A malformed component is dropped without losing the others."""
+    validator = oocsiInterviewValidator()
+    interview = validator.validate_device(
+        "device",
+        device(
+            {
+                "number": {"channel_name": "n", "type": "number", "min_max": [9, 1]},
+                "lamp": {"type": "switch"},
+                "switch": {"channel_name": "switch", "type": "switch"},
+            }
+        ),
+    )
+    assert list(interview["components"]) == ["switch"]
+    assert validator.rejected == 2
+
+
+def test_cache_is_bounded():
+    """Re-announcements with new values do not grow the cache without bound."""
+    validator = oocsiInterviewValidator(size=8)
+    for value in range(100):
+        validator.validate_device(
+            "device",
+            device(
+                {
+                    "sensor": {
+                        "channel_name": "sensor",
+                        "type": "sensor",
+                        "value": value,
+                    }
+                }
+            ),
+        )
+    assert len(validator._cache) == 8
@@ -0,0 +1,14 @@
+"""Tests for the oocsi services."""
+
+from __future__ import annotations
+
+from custom_components.oocsi.services import (
+    START_RECORDING_SCHEMA,
+    STOP_PROFILE_SCHEMA,
+)
+
+
+def test_number_fields_accept_floats():
+    """Number selectors send floats, which are coerced to integers."""
+    assert START_RECORDING_SCHEMA({"backup_count": 3.0})["backup_count"] == 3
+    assert STOP_PROFILE_SCHEMA({"top": 20.0})["top"] == 20
@@ -0,0 +1,140 @@
+"""Record oocsi traffic and replay it for load testing."""
+from __future__ import annotations
+
+import asyncio
+from datetime import timedelta
+import json
+import logging
+import os
+import time
+
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.event import async_track_time_interval
+
+from .const import RECORD_FLUSH_INTERVAL
+from .probe import percentile
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class oocsiTrafficRecorder:
+    """Append received messages to a rotating line-delimited JSON file.
+
+    Each line holds [timestamp, channel, sender, payload]. Lines are buffered
+    on the event loop and written in the executor.
+    """
+
+    def __init__(
+        self, hass: HomeAssistant, path: str, max_bytes: int, backup_count: int
+    ) -> None:
+        self._hass = hass
+        self.path = path
+        self._max_bytes = max_bytes
+        self._backup_count = backup_count
+        self._buffer = []
+        self._lock = asyncio.Lock()
+        self._unsub_flush: CALLBACK_TYPE | None = None
+        self.recorded = 0
+
+    @callback
+    def async_start(self) -> None:
+        """Start flushing buffered records."""
+        self._unsub_flush = async_track_time_interval(
+            self._hass, self._async_flush, timedelta(seconds=RECORD_FLUSH_INTERVAL)
+        )
+
+    async def async_stop(self) -> None:
+        """Stop recording and write what is left."""
+        if self._unsub_flush is not None:
+            self._unsub_flush()
+            self._unsub_flush = None
+        await self._async_flush()
+
+    @callback
+    def record(self, channel, sender, event) -> None:
+        """Buffer one received message."""
+        self._buffer.append(
+            json.dumps(
+                [round(time.time(), 3), channel, sender, event], separators=(",", ":")
+            )
+        )
+        self.recorded += 1
+
+    async def _async_flush(self, _now=None) -> None:
+        if not self._buffer:
+            return
+        lines, self._buffer = self._buffer, []
+        async with self._lock:
+            await self._hass.async_add_executor_job(self._write, lines)
+
+    def _write(self, lines) -> None:
+        with open(self.path, "a", encoding="utf-8") as record_file:
+            record_file.write("\n".join(lines) + "\n")
+            size = record_file.tell()
+        if size >= self._max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        for index in range(self._backup_count - 1, 0, -1):
+            if os.path.exists(f"{self.path}.{index}"):
+                os.replace(f"{self.path}.{index}", f"{self.path}.{index + 1}")
+        if self._backup_count:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+
+
+def read_records(path: str) -> list:
+    """Read a recording, skipping lines that do not parse."""
+    records = []
+    with open(path, encoding="utf-8") as record_file:
+        for line in record_file:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+    return records
+
+
+async def async_replay(
+    hass: HomeAssistant, gateway, path: str, speed: float, to_server: bool
+) -> dict:
+    """Feed a recording back at speed times real time, 0 for max speed.
+
+    Messages are dispatched into the gateway or, with to_server, sent to the
+    oocsi server the gateway is connected to.
+    """
+    records = await hass.async_add_executor_job(read_records, path)
+    loop = hass.loop
+    lags = []
+    start = loop.time()
+
+    for index, (timestamp, channel, sender, payload) in enumerate(records):
+        if speed:
+            due = start + (timestamp - records[0][0]) / speed
+            delay = due - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            lags.append((loop.time() - due) * 1000)
+        elif index % 100 == 0:
+            # Let the rest of Home Assistant run in between bursts
+            await asyncio.sleep(0)
+
+        if to_server:
+            gateway.send(channel, payload)
+        else:
+            gateway.async_inject(sender, channel, payload)
+
+    duration = loop.time() - start
+    lags.sort()
+    stats = {
+        "path": path,
+        "messages": len(records),
+        "duration": round(duration, 3),
+        "throughput": round(len(records) / duration, 1) if duration else None,
+        "lag_p50": percentile(lags, 0.5),
+        "lag_p95": percentile(lags, 0.95),
+        "lag_max": lags[-1] if lags else None,
+    }
+    _LOGGER.info("Replayed %s: %s", path, stats)
+    return stats